@@ -1,9 +1,18 @@
 # backend/agent/detect_agent.py
+import os
 import re
+import json
+import time
 import asyncio
-from typing import Any, Dict, List, Optional
+import hashlib
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timezone
-from mcp_client import get_mcp_tools_cached
+from email.utils import parsedate_to_datetime
+from mcp_client import get_tools_for, tools_in_use
+from agent.thread_store import get_thread_store
+from utils.task_pool import BoundedTaskPool
+from utils.tool_args import accepts_arg, call_tool
+from utils.metrics import span
 
 # High-signal patterns (positive/negative). Tweak as you like.
 POSITIVE_PATTERNS = [
@@ -35,6 +44,23 @@ QUERIES = [
     'in:inbox newer_than:45d (from:(@lever.co OR @greenhouse.io OR @ashbyhq.com OR recruiting@* OR jobs@* OR talent@*))',
 ]
 
+WINDOW = "newer_than:45d"
+WINDOW_SECONDS = 45 * 24 * 3600
+SYNC_OVERLAP_SECONDS = 600  # re-scan a little before the last sync to absorb clock skew
+FULL_SYNC_SECONDS = float(os.environ.get("DETECT_FULL_SYNC_SECONDS", 6 * 3600))
+MAX_PAGES = int(os.environ.get("DETECT_MAX_PAGES", 10))  # per query
+
+# Fetch scheduling: the Gmail MCP server is a single stdio process, so cap the
+# calls in flight, bound each call, and bound the whole endpoint. When the
+# deadline hits we return whatever finished and flag the response as partial.
+MAX_INFLIGHT = int(os.environ.get("DETECT_MAX_INFLIGHT", 8))
+CALL_TIMEOUT = float(os.environ.get("DETECT_CALL_TIMEOUT", 15))
+DEADLINE = float(os.environ.get("DETECT_DEADLINE", 30))
+
+def _since_queries(since: float) -> List[str]:
+    # Gmail accepts epoch seconds for after:
+    return [q.replace(WINDOW, f"after:{int(since)}") for q in QUERIES]
+
 def _title_from_domain(domain: str) -> str:
     # "mail.recruiting.riotgames.com" -> "Riot Games"
     parts = [p for p in domain.split(".") if p not in {"mail", "email", "recruiting", "app"}]
@@ -52,64 +78,132 @@ def _is_interview_like(text: str) -> bool:
         return False
     return bool(POS_RE.search(text))
 
-async def _call_tool(tool, payload: Dict[str, Any]) -> Any:
-    """Call an MCP tool with a few common arg fallbacks."""
-    try:
-        return await tool.ainvoke(payload)
-    except Exception:
-        # Try common alt arg names
-        if "query" in payload:
-            try:
-                return await tool.ainvoke({"q": payload["query"]})
-            except Exception:
-                pass
-        if "thread_id" in payload:
-            try:
-                return await tool.ainvoke({"id": payload["thread_id"]})
-            except Exception:
-                pass
-        raise
-
 async def _get_gmail_tools():
-    tools = await get_mcp_tools_cached()
-    # Find gmail search + thread tools by name/description
-    search_tool = None
-    get_thread_tool = None
-    for t in tools:
-        n = (getattr(t, "name", "") or "").lower()
-        d = (getattr(t, "description", "") or "").lower()
-        if not search_tool and ("search" in n or "search" in d) and "gmail" in (n + d):
-            search_tool = t
-        if not get_thread_tool and ("get_thread" in n or ("thread" in n and "get" in n)) and "gmail" in (n + d):
-            get_thread_tool = t
-    return search_tool, get_thread_tool
+    return await get_tools_for("gmail.search", "gmail.get_thread")
 
-async def _search_thread_ids(search_tool) -> List[str]:
-    thread_ids: List[str] = []
-    seen = set()
-    for q in QUERIES:
+_UNVERSIONED = "0" * 20 + ":" + "0" * 15 + ":"
+
+def _epoch_ms(value: Any) -> int:
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        v = float(value)
+        return int(v if v > 10_000_000_000 else v * 1000)  # epoch ms or s
+    if isinstance(value, str) and value:
         try:
-            res = await _call_tool(search_tool, {"query": q})
-        except Exception:
-            continue
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            pass
+        try:
+            return int(parsedate_to_datetime(value).timestamp() * 1000)
+        except (TypeError, ValueError):
+            pass
+    return 0
+
+def _fingerprint(hit: Any) -> str:
+    """
+    Version of the hit's thread, as a string that sorts by age: the thread's
+    historyId when the search returns threads, else the message's date and id.
+    A thread's fingerprint is the newest one over all of its hits, so it
+    doesn't depend on which query's hit happened to arrive first.
+    """
+    history = str(hit.get("historyId") or hit.get("history_id") or "")
+    history = history.zfill(20) if history.isdigit() else ""
+    when = _epoch_ms(hit.get("internalDate") or hit.get("date") or hit.get("timestamp"))
+    msg_id = str(hit.get("id") or hit.get("message_id") or hit.get("messageId") or "")
+    if not history and not when:
+        # nothing to order by: the snippet at least changes when a message lands
+        digest = hashlib.sha1(json.dumps(hit, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"{_UNVERSIONED}{msg_id.zfill(24)}:{digest}"
+    return f"{history or '0' * 20}:{when:015d}:{msg_id.zfill(24)}"
+
+def _is_newer(fp: str, known: str) -> bool:
+    """Whether a thread at `fp` changed since it was stored at `known`."""
+    if ":" not in known or fp.startswith(_UNVERSIONED) or known.startswith(_UNVERSIONED):
+        return fp != known  # stored by an older version, or no version to compare
+    return fp > known
+
+def _as_obj(res: Any) -> Any:
+    """MCP tools often hand back JSON as text (or as text content blocks)."""
+    if isinstance(res, list) and res and all(isinstance(b, dict) and b.get("type") == "text" for b in res):
+        res = "".join(b.get("text", "") for b in res)
+    if isinstance(res, str):
+        try:
+            return json.loads(res)
+        except ValueError:
+            return {}
+    return res
+
+async def _iter_query_pages(search_tool, query: str) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield one list of search hits per result page, following nextPageToken."""
+    token = None
+    pages = MAX_PAGES if accepts_arg(search_tool, "pageToken") is not False else 1
+    for _ in range(pages):
+        payload: Dict[str, Any] = {"query": query}
+        if token:
+            payload["pageToken"] = token
+        res = _as_obj(await call_tool(search_tool, payload))
         # Accept common result shapes
         if isinstance(res, list):
-            items = res
-        else:
-            items = res.get("threads") or res.get("items") or []
-        for it in items:
-            tid = (it.get("thread_id") or it.get("id") or it.get("threadId") or "").strip()
-            if tid and tid not in seen:
-                seen.add(tid)
-                thread_ids.append(tid)
-    return thread_ids
-
-async def _fetch_thread(get_thread_tool, thread_id: str) -> Dict[str, Any]:
+            yield res
+            return
+        yield res.get("threads") or res.get("items") or res.get("messages") or []
+        token = res.get("nextPageToken") or res.get("next_page_token")
+        if not token:
+            return
+
+async def _iter_thread_hits(search_tool, queries: List[str], stats: List[Dict[str, Any]]) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Run every query concurrently and yield (thread_id, fingerprint) for every
+    hit as it arrives, so callers can start fetching right away. A thread
+    matched by several queries (or messages) comes up once per hit.
+    Appends one {query, ok, pages, results, latency_ms} entry per query to `stats`.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run(q: str) -> None:
+        t0 = time.perf_counter()
+        entry = {"query": q, "ok": True, "pages": 0, "results": 0, "latency_ms": 0.0}
+        try:
+            async for items in _iter_query_pages(search_tool, q):
+                entry["pages"] += 1
+                for it in items:
+                    if not isinstance(it, dict):
+                        continue
+                    tid = (it.get("thread_id") or it.get("threadId") or it.get("id") or "").strip()
+                    if tid:
+                        entry["results"] += 1
+                        queue.put_nowait((tid, _fingerprint(it)))
+        except Exception:
+            entry["ok"] = False
+        finally:
+            entry["latency_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            stats.append(entry)
+            queue.put_nowait(None)
+
+    tasks = [asyncio.create_task(run(q)) for q in queries]
+    pending = len(tasks)
+    try:
+        while pending:
+            hit = await queue.get()
+            if hit is None:
+                pending -= 1
+            else:
+                yield hit
+    finally:
+        for t in tasks:
+            t.cancel()
+
+async def _search_thread_ids(search_tool) -> List[str]:
+    """Union of every query, all pages included."""
+    return list(dict.fromkeys([tid async for tid, _ in _iter_thread_hits(search_tool, QUERIES, [])]))
+
+async def _fetch_thread(get_thread_tool, thread_id: str) -> Optional[Dict[str, Any]]:
+    """The thread, or None when the call failed."""
     try:
-        res = await _call_tool(get_thread_tool, {"thread_id": thread_id})
+        res = await call_tool(get_thread_tool, {"thread_id": thread_id})
     except Exception:
-        return {"thread_id": thread_id}
-    return res if isinstance(res, dict) else {"thread_id": thread_id, "raw": res}
+        return None
+    obj = _as_obj(res)  # JSON text from the MCP server
+    return obj if isinstance(obj, dict) and obj else {"thread_id": thread_id, "raw": res}
 
 def _extract_fields(thread: Dict[str, Any]) -> Dict[str, Any]:
     tid = thread.get("thread_id") or thread.get("id") or thread.get("threadId") or ""
@@ -162,25 +256,116 @@ def _extract_fields(thread: Dict[str, Any]) -> Dict[str, Any]:
     }
     return item
 
-async def run_detect_interviews() -> Dict[str, Any]:
-    search_tool, get_thread_tool = await _get_gmail_tools()
+async def _search_until(deadline: float, search_tool, queries: List[str], stats: List[Dict[str, Any]],
+                        on_hit: Callable[[str, str], None]) -> bool:
+    """Feed search hits to `on_hit` until the searches finish (True) or the deadline passes (False)."""
+    async def consume():
+        async for tid, fp in _iter_thread_hits(search_tool, queries, stats):
+            on_hit(tid, fp)
+    with span("detect.search"):
+        try:
+            await asyncio.wait_for(consume(), max(0.0, deadline - time.monotonic()))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+def _fetch_pool(get_thread_tool) -> Tuple[BoundedTaskPool, Callable[[str], None]]:
+    pool = BoundedTaskPool(max_inflight=MAX_INFLIGHT, call_timeout=CALL_TIMEOUT)
+    def submit(tid: str) -> None:
+        pool.submit(tid, lambda: _fetch_thread(get_thread_tool, tid))
+    return pool, submit
+
+async def _detect_incremental(search_tool, get_thread_tool, stats: List[Dict[str, Any]],
+                              deadline: float) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Only fetch threads that are new or whose search hit changed since the last
+    sync; everything else comes from the local thread store. A full 45-day
+    rescan still runs every FULL_SYNC_SECONDS to drop threads that left the inbox.
+    Returns (items, partial).
+    """
+    store = get_thread_store()
+    started = time.time()
+    last_sync = store.get_meta("last_sync")
+    last_full = store.get_meta("last_full_sync")
+    full = last_sync is None or last_full is None or started - last_full > FULL_SYNC_SECONDS
+    queries = QUERIES if full else _since_queries(last_sync - SYNC_OVERLAP_SECONDS)
+
+    hits: Dict[str, str] = {}  # thread id -> newest fingerprint over all of its hits
+    fetching: Set[str] = set()
+    pool, fetch = _fetch_pool(get_thread_tool)
+
+    def on_hit(tid: str, fp: str) -> None:
+        if fp <= hits.get(tid, ""):
+            return  # an older (or the same) message of a thread already seen
+        hits[tid] = fp
+        if tid in fetching:
+            return
+        if _is_newer(fp, store.fingerprints([tid]).get(tid) or ""):
+            fetching.add(tid)
+            fetch(tid)
+
+    searched = await _search_until(deadline, search_tool, queries, stats, on_hit)
+    store.touch([tid for tid in hits if tid not in fetching])
+    with span("detect.fetch"):
+        done, cut = await pool.drain(deadline)
+
+    complete = searched and not cut and all(e["ok"] for e in stats)
+    for tid in fetching:
+        thread = done.get(tid)
+        if thread is None:
+            complete = False  # fetch failed or timed out; don't advance the sync marker past it
+            continue
+        item = _extract_fields(thread)
+        if item and not item["thread_id"]:
+            item["thread_id"] = tid
+        store.record(tid, hits[tid], item or None)
+
+    if complete:
+        store.set_meta("last_sync", started)
+        if full:
+            store.set_meta("last_full_sync", started)
+            store.retain(list(hits))
+    store.prune(started - WINDOW_SECONDS)
+    return store.items(), not complete
+
+async def run_detect_interviews(incremental: Optional[bool] = None) -> Dict[str, Any]:
+    with span("detect.total"):
+        async with tools_in_use():
+            return await _detect_interviews(incremental)
+
+async def _detect_interviews(incremental: Optional[bool]) -> Dict[str, Any]:
+    deadline = time.monotonic() + DEADLINE
+    with span("detect.tools"):
+        search_tool, get_thread_tool = await _get_gmail_tools()
     if not search_tool:
         # Fail safe: no search tool found
         return {"interviews": []}
 
-    ids = await _search_thread_ids(search_tool)
+    if incremental is None:
+        incremental = os.environ.get("DETECT_INCREMENTAL", "1") == "1"
+
     out: List[Dict[str, Any]] = []
+    search_stats: List[Dict[str, Any]] = []
+    partial = False
 
-    if get_thread_tool:
-        # Fetch each thread and apply strict rule-based filter
-        tasks = [asyncio.create_task(_fetch_thread(get_thread_tool, tid)) for tid in ids]
-        for task in asyncio.as_completed(tasks):
-            thread = await task
-            item = _extract_fields(thread)
+    if incremental and get_thread_tool:
+        out, partial = await _detect_incremental(search_tool, get_thread_tool, search_stats, deadline)
+    elif get_thread_tool:
+        # Fetch each thread as soon as search discovers it, then apply strict rule-based filter
+        pool, fetch = _fetch_pool(get_thread_tool)
+        searched = await _search_until(deadline, search_tool, QUERIES, search_stats, lambda tid, _fp: fetch(tid))
+        with span("detect.fetch"):
+            done, cut = await pool.drain(deadline)
+        partial = not searched or bool(cut)
+        for thread in done.values():
+            item = _extract_fields(thread) if thread is not None else None
             if item:
                 out.append(item)
     else:
         # Fallback: filter using only subjects from search results
+        ids: Dict[str, None] = {}
+        partial = not await _search_until(deadline, search_tool, QUERIES, search_stats,
+                                          lambda tid, _fp: ids.setdefault(tid))
         for tid in ids:
             item = {"thread_id": tid, "company": "", "role": "", "subject": "", "date": "", "sender": "", "recruiter_name": "", "meeting_time": ""}
             if _is_interview_like(item["subject"]):
@@ -195,4 +380,4 @@ async def run_detect_interviews() -> Dict[str, Any]:
         seen.add(it["thread_id"])
         uniq.append(it)
 
-    return {"interviews": uniq}
+    return {"interviews": uniq, "partial": partial, "search_stats": search_stats}
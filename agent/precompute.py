@@ -0,0 +1,154 @@
+# agent/precompute.py
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from agent.detect_agent import run_detect_interviews
+from agent.prep_agent import cached_brief, submit_thread_prep
+from utils.rate_limit import TokenBucket
+
+# Background scheduler that warms prep briefs before the user opens them.
+# Every PREP_PRECOMPUTE_INTERVAL seconds it runs interview detection, picks
+# threads whose meeting is coming up (or, when no meeting time was parsed,
+# whose latest email is recent), and generates missing briefs into the prep
+# cache through the job queue, so a user opening the brief mid-run attaches
+# to the same job. Generation is rate limited and capped in concurrency so
+# it never crowds out interactive requests.
+
+INTERVAL = float(os.environ.get("PREP_PRECOMPUTE_INTERVAL", 15 * 60))
+START_DELAY = float(os.environ.get("PREP_PRECOMPUTE_DELAY", 30))
+LOOKAHEAD_HOURS = float(os.environ.get("PREP_PRECOMPUTE_LOOKAHEAD_HOURS", 48))
+RECENT_HOURS = float(os.environ.get("PREP_PRECOMPUTE_RECENT_HOURS", 72))
+MAX_CONCURRENT = int(os.environ.get("PREP_PRECOMPUTE_CONCURRENCY", 2))
+PER_HOUR = float(os.environ.get("PREP_PRECOMPUTE_PER_HOUR", 20))
+BURST = float(os.environ.get("PREP_PRECOMPUTE_BURST", 5))
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def select_due(interviews: List[Dict[str, Any]], now: Optional[datetime] = None,
+               lookahead_hours: float = LOOKAHEAD_HOURS,
+               recent_hours: float = RECENT_HOURS) -> List[Tuple[float, str]]:
+    """
+    (priority, thread_id) for interviews worth warming, most urgent first.
+    Meetings inside the lookahead window rank by how soon they start; threads
+    without a meeting time rank after them, newest email first.
+    """
+    now = now or datetime.now(timezone.utc)
+    due: List[Tuple[float, str]] = []
+    for it in interviews:
+        tid = it.get("thread_id")
+        if not tid:
+            continue
+        meeting = _parse_time(it.get("meeting_time"))
+        if meeting is not None:
+            hours = (meeting - now).total_seconds() / 3600
+            if 0 <= hours <= lookahead_hours:
+                due.append((hours, tid))
+            continue
+        sent = _parse_time(it.get("date"))
+        if sent is not None:
+            age = (now - sent).total_seconds() / 3600
+            if 0 <= age <= recent_hours:
+                due.append((lookahead_hours + age, tid))
+    due.sort()
+    return due
+
+
+class PrecomputeScheduler:
+    def __init__(self, interval: float = INTERVAL, max_concurrent: int = MAX_CONCURRENT,
+                 per_hour: float = PER_HOUR, burst: float = BURST):
+        self.interval = interval
+        self.max_concurrent = max(1, max_concurrent)
+        self.bucket = TokenBucket(rate=per_hour / 3600, burst=burst)
+        self._task: Optional[asyncio.Task] = None
+        self._cycle_lock: Optional[asyncio.Lock] = None
+        self.stats: Dict[str, Any] = {
+            "cycles": 0, "candidates": 0, "warmed": 0, "already_cached": 0, "rate_limited": 0,
+            "errors": 0, "last_cycle_at": None, "last_cycle_ms": None, "last_error": None,
+        }
+
+    async def _warm(self, thread_id: str, sem: asyncio.Semaphore) -> str:
+        async with sem:
+            if await cached_brief(thread_id) is not None:
+                return "already_cached"
+            if not self.bucket.try_acquire():
+                return "rate_limited"
+            job = await submit_thread_prep(thread_id)
+            await job.done.wait()
+            return "errors" if job.error else "warmed"
+
+    async def run_once(self) -> Dict[str, Any]:
+        """One detect + warm pass. Concurrent calls share the lock, so passes never overlap."""
+        if self._cycle_lock is None:
+            self._cycle_lock = asyncio.Lock()
+        async with self._cycle_lock:
+            t0 = time.perf_counter()
+            counts = {"candidates": 0, "warmed": 0, "already_cached": 0, "rate_limited": 0, "errors": 0}
+            try:
+                detected = await run_detect_interviews()
+                due = select_due(detected.get("interviews") or [])
+                counts["candidates"] = len(due)
+                sem = asyncio.Semaphore(self.max_concurrent)
+                # urgency order is kept for the rate limiter: tasks start in order and
+                # take tokens in that order as they get through the semaphore
+                results = await asyncio.gather(*(self._warm(tid, sem) for _, tid in due), return_exceptions=True)
+                for r in results:
+                    if isinstance(r, Exception):
+                        counts["errors"] += 1
+                        self.stats["last_error"] = repr(r)
+                    else:
+                        counts[r] += 1
+            except Exception as e:
+                counts["errors"] += 1
+                self.stats["last_error"] = repr(e)
+                print("[precompute] cycle failed:", repr(e))
+            for k, v in counts.items():
+                self.stats[k] += v
+            self.stats["cycles"] += 1
+            self.stats["last_cycle_at"] = time.time()
+            self.stats["last_cycle_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            return counts
+
+    async def run_forever(self, start_delay: float = START_DELAY) -> None:
+        await asyncio.sleep(start_delay)
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the loop on the current (shared) event loop; no-op if already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run_forever())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "max_concurrent": self.max_concurrent,
+            "tokens_available": round(self.bucket.peek(), 2),  # called from request threads: no refill
+        }
+
+
+_scheduler: Optional[PrecomputeScheduler] = None
+
+
+def get_scheduler() -> PrecomputeScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PrecomputeScheduler()
+    return _scheduler
+
+
+async def start_scheduler() -> None:
+    get_scheduler().start()
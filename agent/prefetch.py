@@ -0,0 +1,108 @@
+# agent/prefetch.py
+import os
+import re
+import time
+import asyncio
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+from mcp_client import get_tool
+from utils.tool_args import call_tool
+from utils.web_cache import normalize_url
+
+# Deterministic prefetch of the URLs found in a recruiting thread. Instead of
+# letting the ReAct loop open each link (one full LLM turn per page), we
+# classify the links, scrape the useful ones concurrently through the
+# web.scrape tool and hand the cleaned text to the agent up front.
+
+JD = "jd"
+CAREERS = "careers"
+SCHEDULING = "scheduling"
+TRACKING = "tracking"
+OTHER = "other"
+
+_ATS_HOSTS = ("greenhouse.io", "lever.co", "ashbyhq.com", "workable.com", "smartrecruiters.com",
+              "myworkdayjobs.com", "jobvite.com", "icims.com", "bamboohr.com", "recruitee.com")
+_SCHEDULING_HOSTS = ("calendly.com", "goodtime.io", "zoom.us", "meet.google.com", "teams.microsoft.com",
+                     "calendar.google.com", "modernloop.io", "prelude.co", "cal.com", "doodle.com", "webex.com")
+_TRACKING_RE = re.compile(
+    r"(unsubscribe|/open\b|/track|/click|pixel|beacon|/wf/|sendgrid|mailchimp|list-manage|mandrillapp|"
+    r"\.(png|jpe?g|gif|svg)(\?|$)|/ls/click|email\.|links\.)", re.I)
+_JD_PATH_RE = re.compile(r"/(jobs?|positions?|openings?|postings?|careers?)/[^/?#]*[\w-]{3,}", re.I)
+_CAREERS_PATH_RE = re.compile(r"/(careers?|jobs|join-us|work-with-us)/?$", re.I)
+
+PREFETCH_TIMEOUT = float(os.environ.get("PREP_PREFETCH_TIMEOUT", 20))
+PREFETCH_MAX_PAGES = int(os.environ.get("PREP_PREFETCH_MAX_PAGES", 3))
+PREFETCH_MAX_CHARS = int(os.environ.get("PREP_PREFETCH_MAX_CHARS", 6000))  # per page
+
+
+def classify_url(url: str) -> str:
+    # utm_* and friends say nothing about the page: a careers link shared with
+    # ?utm_source=greenhouse is still a job posting, so they go before matching
+    url = normalize_url(url)
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return OTHER
+    host = (parsed.hostname or "").lower()
+    path = parsed.path or "/"
+    if any(host == h or host.endswith("." + h) for h in _SCHEDULING_HOSTS):
+        return SCHEDULING
+    if any(host == h or host.endswith("." + h) for h in _ATS_HOSTS):
+        # boards.greenhouse.io/acme -> board, boards.greenhouse.io/acme/jobs/123 -> posting
+        return JD if len([seg for seg in path.split("/") if seg]) >= 2 else CAREERS
+    if _TRACKING_RE.search(url):
+        return TRACKING
+    if _JD_PATH_RE.search(path):
+        return JD
+    if _CAREERS_PATH_RE.search(path):
+        return CAREERS
+    return OTHER
+
+
+def select_urls(urls: List[str], limit: int = PREFETCH_MAX_PAGES) -> List[Tuple[str, str]]:
+    """JD links first, then careers pages; scheduling/tracking/other are never scraped."""
+    ranked = [(u, classify_url(u)) for u in urls]
+    picked = [x for x in ranked if x[1] == JD] + [x for x in ranked if x[1] == CAREERS]
+    return picked[:limit]
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)          # markdown images
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)       # keep link text only
+    text = re.sub(r"<[^>]+>", " ", text)                        # stray html
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    return text.strip()[:PREFETCH_MAX_CHARS]
+
+
+def _page_text(res: Any) -> str:
+    if isinstance(res, list):  # content blocks
+        res = "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in res)
+    if isinstance(res, dict):
+        res = res.get("markdown") or res.get("content") or res.get("text") or ""
+    return res if isinstance(res, str) else str(res or "")
+
+
+async def prefetch_pages(urls: List[str]) -> List[Dict[str, Any]]:
+    """
+    Scrape the JD/careers links in `urls` concurrently.
+    Returns [{url, kind, text, ms}] for pages that came back with content.
+    """
+    picked = select_urls(urls)
+    if not picked:
+        return []
+    scrape = await get_tool("web.scrape")
+    if scrape is None:
+        return []
+
+    async def one(url: str, kind: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            res = await asyncio.wait_for(call_tool(scrape, {"url": url}), PREFETCH_TIMEOUT)
+            text = _clean(_page_text(res))
+        except Exception:
+            text = ""
+        return {"url": url, "kind": kind, "text": text, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+    pages = await asyncio.gather(*(one(u, k) for u, k in picked))
+    return [p for p in pages if p["text"]]
@@ -0,0 +1,177 @@
+# agent/prep_batch.py
+import os
+import time
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from llm_pool import agent_model, get_react_agent
+from mcp_client import current_tenant, tools_in_use
+from utils.jobs import RUNNING, Job, get_job_queue
+from agent.research_cache import normalize_company
+from agent.prep_agent import (
+    run_prep_agent, thread_job_key, _load_thread, _prefetch, _thread_messages,
+    _finalize_plan, _invoke, THREAD_REQUIRED,
+)
+from utils.metrics import span
+from utils.budget import own_budget, set_budget
+
+# Batch prep for the interviews list. Threads are fetched together and grouped
+# by inferred company; each company is researched once (through the research
+# cache, so it's shared with /api/prep/build too) while the role-specific part
+# of every thread runs concurrently with it. The company research is merged
+# into each thread's brief at the end.
+
+BATCH_CONCURRENCY = int(os.environ.get("PREP_BATCH_CONCURRENCY", 4))  # agent runs at once
+BATCH_MAX_THREADS = int(os.environ.get("PREP_BATCH_MAX_THREADS", 25))
+
+# company sections are filled from the shared research, so they don't trigger escalation
+_ROLE_REQUIRED = tuple(k for k in THREAD_REQUIRED if k != "company_snapshot")
+
+# thread-plan key <- company research key
+_COMPANY_FIELDS = {"company_snapshot": "snapshot", "news": "news", "team": "team", "tech_stack": "tech_stack"}
+
+_stats: Dict[str, Any] = {"batches": 0, "threads": 0, "briefs": 0, "cached": 0, "joined": 0, "errors": 0,
+                          "companies_researched": 0, "threads_sharing_research": 0, "total_ms": 0.0}
+
+def _merge_research(plan: Dict[str, Any], research: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not research:
+        return plan
+    for key, src in _COMPANY_FIELDS.items():
+        value = research.get(src)
+        if key == "tech_stack" and isinstance(value, list):
+            # JD-derived stack first, then whatever the company research found
+            seen = {str(x).lower() for x in plan[key]}
+            plan[key] = plan[key] + [x for x in value if str(x).lower() not in seen]
+        elif value and not plan.get(key):
+            plan[key] = value
+    if research.get("incomplete") and not plan.get("incomplete"):
+        plan["incomplete"] = True
+        plan["incomplete_reason"] = research.get("incomplete_reason")
+    return plan
+
+async def _research(company: str, role: str, sem: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+    async with sem:
+        set_budget()  # from when it gets a slot, not from when the batch started
+        try:
+            return await run_prep_agent(company, role)
+        except Exception as e:
+            print(f"[prep batch] research failed for {company!r}:", repr(e))
+            return None
+
+async def _role_brief(thread_id: str, context: Tuple[str, List[str], str, str],
+                      skip_company: bool, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    async with sem:
+        # each thread's own budget starts once it has a slot: threads queued
+        # behind BATCH_CONCURRENCY others would otherwise run out waiting
+        budget = set_budget()
+        agent = await get_react_agent(agent_model())
+        pages = await _prefetch(context)
+        messages = _thread_messages(thread_id, context, pages, skip_company=skip_company)
+        with span("batch.role_agent"):
+            msgs, reason = await _invoke(agent, messages, "batch_role", budget)
+    required = _ROLE_REQUIRED if skip_company else THREAD_REQUIRED
+    return await _finalize_plan(msgs, context[2], context[3], required, stopped=reason, budget=budget)
+
+async def run_prep_batch(thread_ids: List[str]) -> Dict[str, Any]:
+    """
+    Briefs for many threads at once.
+    Returns {briefs: {thread_id: brief}, errors: {thread_id: error}, stats: {...}}.
+    """
+    async with tools_in_use():
+        return await _prep_batch(thread_ids)
+
+async def _prep_batch(thread_ids: List[str]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    ids = list(dict.fromkeys(t for t in thread_ids if t))[:BATCH_MAX_THREADS]
+    loaded = await asyncio.gather(*(_load_thread(t) for t in ids), return_exceptions=True)
+
+    briefs: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    joined: Dict[str, Job] = {}
+    groups: Dict[str, List[str]] = {}
+    contexts: Dict[str, Tuple[Tuple[str, List[str], str, str], Any, str]] = {}
+    queue = get_job_queue()
+    for tid, res in zip(ids, loaded):
+        if isinstance(res, Exception):
+            errors[tid] = repr(res)
+            continue
+        context, cache, cache_key = res
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            briefs[tid] = cached
+            continue
+        job = queue.active(thread_job_key(tid))
+        if job is not None and job.status == RUNNING:  # someone already opened this one
+            joined[tid] = job
+            continue
+        contexts[tid] = res
+        groups.setdefault(normalize_company(context[2]), []).append(tid)
+
+    sem = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+    research_tasks: Dict[str, asyncio.Task] = {}
+    for ckey, tids in groups.items():
+        if ckey:  # unknown company: the thread's own agent does the research
+            _, _, company, role = contexts[tids[0]][0]
+            research_tasks[ckey] = asyncio.ensure_future(_research(company, role, sem))
+
+    async def one(tid: str) -> None:
+        context, cache, cache_key = contexts[tid]
+        ckey = normalize_company(context[2])
+        try:
+            plan = await _role_brief(tid, context, bool(ckey), sem)
+            if ckey:
+                plan = _merge_research(plan, await research_tasks[ckey])
+        except Exception as e:
+            errors[tid] = repr(e)
+            print(f"[prep batch] thread {tid!r} failed:", repr(e))
+            return
+        if cache is not None and not plan.get("incomplete"):  # a partial brief gets another try
+            cache.set(cache_key, plan, tag=tid, replace_tag=True)
+        briefs[tid] = plan
+
+    async def wait_joined(tid: str, job: Job) -> None:
+        await job.done.wait()
+        if job.error:
+            errors[tid] = job.error
+        else:
+            briefs[tid] = job.result
+
+    await asyncio.gather(*(one(t) for t in contexts), *(wait_joined(t, j) for t, j in joined.items()))
+
+    ms = (time.perf_counter() - t0) * 1000
+    produced = len(contexts) - sum(1 for t in contexts if t in errors)
+    stats = {
+        "threads": len(ids),
+        "briefs": len(briefs),
+        "generated": produced,
+        "cached": len(ids) - len(contexts) - len(joined) - sum(1 for r in loaded if isinstance(r, Exception)),
+        "joined": len(joined),
+        "errors": len(errors),
+        "companies": len(research_tasks),
+        "ms": round(ms, 1),
+        "briefs_per_minute": round(len(briefs) / (ms / 60000), 1) if ms else None,
+    }
+    _stats["batches"] += 1
+    _stats["threads"] += len(ids)
+    _stats["briefs"] += len(briefs)
+    _stats["cached"] += stats["cached"]
+    _stats["joined"] += len(joined)
+    _stats["errors"] += len(errors)
+    _stats["companies_researched"] += len(research_tasks)
+    _stats["threads_sharing_research"] += sum(len(t) for k, t in groups.items() if k and len(t) > 1)
+    _stats["total_ms"] += ms
+    return {"briefs": briefs, "errors": errors, "stats": stats}
+
+def batch_stats() -> Dict[str, Any]:
+    total_min = _stats["total_ms"] / 60000
+    return {**_stats, "total_ms": round(_stats["total_ms"], 1),
+            "briefs_per_minute": round(_stats["briefs"] / total_min, 1) if total_min else None}
+
+def batch_job_key(thread_ids: List[str]) -> str:
+    blob = "\n".join([current_tenant()] + sorted(set(thread_ids)))
+    digest = hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+    return f"batch:{digest}"
+
+async def submit_batch_prep(thread_ids: List[str]) -> Job:
+    return await get_job_queue().submit("batch_prep", batch_job_key(thread_ids),
+                                        lambda: own_budget(run_prep_batch(thread_ids)))
@@ -0,0 +1,124 @@
+# agent/research_cache.py
+import os
+import re
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.sqlite_cache import SQLiteCache
+from utils.budget import set_budget
+
+# Company research is shared by every candidate prepping for that company, so it
+# is stored apart from the (tiny) role-specific part. Entries are served with
+# stale-while-revalidate: past `fresh_for` seconds the cached brief is still
+# returned immediately and a background refresh is kicked off; past
+# `max_stale` the entry is gone and the caller waits for fresh research.
+
+COMPANY_KEYS = ("snapshot", "news", "team", "tech_stack")
+ROLE_KEYS = ("company", "role")
+
+_LEGAL_SUFFIXES = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "plc", "gmbh", "ag", "sa"}
+
+ResearchFn = Callable[[str, str], Awaitable[Dict[str, Any]]]
+
+
+def normalize_company(name: str) -> str:
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split()
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", (role or "").lower()).split())
+
+
+def _is_empty(brief: Dict[str, Any]) -> bool:
+    return not any(brief.get(k) for k in COMPANY_KEYS)
+
+
+class ResearchCache:
+    def __init__(self, fresh_for: float, max_stale: float, max_entries: int):
+        self.fresh_for = fresh_for
+        self.companies = SQLiteCache("research_company", ttl=max_stale, max_entries=max_entries)
+        self.roles = SQLiteCache("research_role", ttl=max_stale, max_entries=max_entries * 4)
+        self.stale_served = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_research(self, company: str, role: str, research: ResearchFn) -> Dict[str, Any]:
+        ckey = normalize_company(company)
+        rkey = f"{ckey}|{normalize_role(role)}"
+        if not ckey:
+            return await research(company, role)
+
+        entry = self.companies.get_entry(ckey)
+        if entry is None:
+            return await self._research_once(ckey, rkey, company, role, research)
+
+        company_part, created_at = entry
+        role_part = self.roles.get(rkey) or {"company": company_part.get("company") or company, "role": role}
+        if time.time() - created_at > self.fresh_for:
+            self.stale_served += 1
+            self._start(ckey, rkey, company, role, research)  # revalidate in background
+        return {**role_part, **{k: company_part.get(k) for k in COMPANY_KEYS}}
+
+    # ---------- single-flight research ----------
+
+    def _start(self, ckey: str, rkey: str, company: str, role: str, research: ResearchFn) -> asyncio.Task:
+        task = self._inflight.get(ckey)
+        if task is None:
+            task = asyncio.ensure_future(self._run(ckey, rkey, company, role, research))
+            self._inflight[ckey] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(ckey, None))
+        return task
+
+    async def _research_once(self, ckey: str, rkey: str, company: str, role: str,
+                             research: ResearchFn) -> Dict[str, Any]:
+        brief = await asyncio.shield(self._start(ckey, rkey, company, role, research))
+        if brief is None:
+            raise RuntimeError(f"research failed for {company!r}")
+        role_part = self.roles.get(rkey) or {"company": brief.get("company") or company, "role": role}
+        return {**brief, **role_part}
+
+    async def _run(self, ckey: str, rkey: str, company: str, role: str,
+                   research: ResearchFn) -> Optional[Dict[str, Any]]:
+        self.refreshes += 1
+        set_budget()  # own task: shared by every waiter and may outlive the request that started it
+        try:
+            brief = await research(company, role)
+        except Exception as e:
+            self.refresh_errors += 1
+            print(f"[research_cache] refresh failed for {company!r}:", repr(e))
+            return None
+        if not _is_empty(brief) and not brief.get("incomplete"):
+            self.companies.set(ckey, {"company": brief.get("company") or company,
+                                      **{k: brief.get(k) for k in COMPANY_KEYS}})
+            self.roles.set(rkey, {k: brief.get(k) or "" for k in ROLE_KEYS}, tag=ckey)
+        return brief
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "companies": self.companies.stats(),
+            "roles": self.roles.stats(),
+            "stale_served": self.stale_served,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "in_flight": len(self._inflight),
+        }
+
+
+_research_cache: Optional[ResearchCache] = None
+
+
+def get_research_cache() -> Optional[ResearchCache]:
+    global _research_cache
+    if os.environ.get("RESEARCH_CACHE_DISABLE") == "1":
+        return None
+    if _research_cache is None:
+        _research_cache = ResearchCache(
+            fresh_for=float(os.environ.get("RESEARCH_FRESH_SECONDS", 24 * 3600)),
+            max_stale=float(os.environ.get("RESEARCH_MAX_STALE_SECONDS", 14 * 24 * 3600)),
+            max_entries=int(os.environ.get("RESEARCH_CACHE_MAX_ENTRIES", 200)),
+        )
+    return _research_cache
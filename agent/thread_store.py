@@ -0,0 +1,105 @@
+# agent/thread_store.py
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+from utils.sqlite_cache import cache_dir
+from mcp_client import current_tenant
+
+# Local memory of what interview detection has already looked at. For every
+# thread we keep the fingerprint of its search hit (changes when a new message
+# lands) and the fields _extract_fields() produced, or NULL when the thread was
+# not interview-like. Sync timestamps let detection ask Gmail only for mail
+# newer than the previous run.
+
+
+class ThreadStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir(), "detect_threads.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            " thread_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, item TEXT,"
+            " seen_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    # ---------- threads ----------
+
+    def fingerprints(self, thread_ids: List[str]) -> Dict[str, str]:
+        if not thread_ids:
+            return {}
+        out: Dict[str, str] = {}
+        with self._lock:
+            for i in range(0, len(thread_ids), 500):  # stay under SQLite's variable limit
+                chunk = thread_ids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT thread_id, fingerprint FROM threads WHERE thread_id IN ({marks})", chunk
+                ).fetchall()
+                out.update(dict(rows))
+        return out
+
+    def record(self, thread_id: str, fingerprint: str, item: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, fingerprint, item, seen_at) VALUES (?, ?, ?, ?)",
+                (thread_id, fingerprint, json.dumps(item) if item else None, time.time()),
+            )
+
+    def touch(self, thread_ids: List[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE threads SET seen_at = ? WHERE thread_id = ?", [(now, t) for t in thread_ids])
+
+    def items(self) -> List[Dict[str, Any]]:
+        """All stored interview items (non-interview threads are skipped)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT item FROM threads WHERE item IS NOT NULL").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def prune(self, older_than: float) -> int:
+        """Drop threads that no search has returned since `older_than`."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM threads WHERE seen_at < ?", (older_than,))
+            return max(cur.rowcount, 0)
+
+    def retain(self, thread_ids: List[str]) -> int:
+        """Drop every thread not in `thread_ids` (after a full resync)."""
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (thread_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM keep_ids")
+            self._conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", [(t,) for t in thread_ids])
+            cur = self._conn.execute("DELETE FROM threads WHERE thread_id NOT IN (SELECT thread_id FROM keep_ids)")
+            return max(cur.rowcount, 0)
+
+    # ---------- sync markers ----------
+
+    def get_meta(self, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return float(row[0]) if row else None
+
+    def set_meta(self, key: str, value: float) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+_stores: Dict[str, ThreadStore] = {}
+
+
+def get_thread_store() -> ThreadStore:
+    """Store for the current mailbox (see mcp_client.current_tenant)."""
+    tenant = current_tenant()
+    store = _stores.get(tenant)
+    if store is None:
+        name = "detect_threads.sqlite"
+        if tenant:
+            name = f"detect_threads-{hashlib.sha256(tenant.encode('utf-8')).hexdigest()[:12]}.sqlite"
+        store = _stores[tenant] = ThreadStore(os.path.join(cache_dir(), name))
+    return store
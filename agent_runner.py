@@ -1,20 +1,11 @@
 # agent_runner.py
 import datetime as dt
-from langgraph.prebuilt import create_react_agent
-from langchain.chat_models import init_chat_model
-from mcp_client import get_mcp_client
-from mcp_client import get_mcp_tools_cached
-import os
+from llm_pool import get_react_agent
 
 
 async def build_agent():
-    llm = init_chat_model(
-        "gemini-2.5-pro",
-        model_provider="google_genai",
-        api_key=os.environ.get("GOOGLE_API_KEY")
-    )
-    client = get_mcp_client()
-    return create_react_agent(llm, tools=await get_mcp_tools_cached())
+    # pooled model client + graph compiled once per MCP tool set
+    return await get_react_agent()
 
 async def run_agent(prompt: str, SYSTEM_PROMPT: str):
     agent = await build_agent()
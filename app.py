@@ -1,14 +1,29 @@
 # app.py
+import os
 from flask import Flask
-from routes.interview_routes import interview_bp
 from dotenv import load_dotenv
 from flask_cors import CORS
 
-load_dotenv()  # loads from .env
+load_dotenv()  # loads from .env (before importing modules that read config at import time)
+
+from routes.interview_routes import interview_bp
+from utils.async_runtime import spawn
+from llm_pool import warm_up
+from mcp_client import start_mcp
+from agent.precompute import start_scheduler
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 app.register_blueprint(interview_bp)
 
+if os.environ.get("MCP_EAGER_START", "1") == "1":
+    spawn(start_mcp())  # launch the npx servers now, not on the first request
+
+if os.environ.get("PREP_WARMUP", "1") == "1":
+    spawn(warm_up())  # model clients + compiled agent graph, off the request path
+
+if os.environ.get("PREP_PRECOMPUTE", "1") == "1":
+    spawn(start_scheduler())  # warm briefs for upcoming interviews in the background
+
 if __name__ == '__main__':
     app.run(debug=True, use_reloader=False)
\ No newline at end of file
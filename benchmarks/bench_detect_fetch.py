@@ -0,0 +1,118 @@
+# benchmarks/bench_detect_fetch.py
+"""
+Tail latency of run_detect_interviews against a fake, slow Gmail MCP server.
+
+The fake server behaves like the single stdio process we talk to in prod:
+it only works on `--server-capacity` calls at a time (the rest queue), most
+get_thread calls take a few ms, and a small fraction hang for a long time.
+
+  before: one task per thread id, no cap, no timeouts (the old code path)
+  after:  BoundedTaskPool with DETECT_MAX_INFLIGHT / DETECT_CALL_TIMEOUT /
+          DETECT_DEADLINE (the current code path)
+
+Run from the repo root:
+    python -m benchmarks.bench_detect_fetch [--threads 200] [--runs 20]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import mcp_client
+import agent.detect_agent as detect
+
+
+class _FakeTool:
+    def __init__(self, name, fn):
+        self.name = name
+        self.description = f"gmail {name}"
+        self._fn = fn
+
+    async def ainvoke(self, payload):
+        return await self._fn(payload)
+
+
+def _fake_tools(n_threads: int, capacity: int, base_ms: float, hang_rate: float, hang_s: float, rng: random.Random):
+    server = asyncio.Semaphore(capacity)
+
+    async def search(payload):
+        async with server:
+            await asyncio.sleep(base_ms / 1000)
+        return json.dumps({"threads": [{"id": f"t{i}", "snippet": "interview"} for i in range(n_threads)]})
+
+    async def get_thread(payload):
+        hang = rng.random() < hang_rate
+        async with server:
+            await asyncio.sleep(hang_s if hang else base_ms / 1000)
+        tid = payload["thread_id"]
+        return {"thread_id": tid, "messages": [{"subject": "Interview", "from": "r@acme.com"}]}
+
+    return [_FakeTool("search_threads", search), _FakeTool("get_thread", get_thread)]
+
+
+async def _legacy_detect(tools):
+    # pre-scheduler behaviour: fan out every fetch at once and wait for all of them
+    search_tool, get_thread_tool = tools
+    ids = await detect._search_thread_ids(search_tool)
+    tasks = [asyncio.create_task(detect._fetch_thread(get_thread_tool, tid)) for tid in ids]
+    out = []
+    for task in asyncio.as_completed(tasks):
+        thread = await task
+        item = detect._extract_fields(thread) if thread is not None else None
+        if item:
+            out.append(item)
+    return {"interviews": out}
+
+
+async def _no_servers():
+    return []  # runs hold the tool set (mcp_client.tools_in_use); don't start real servers for it
+
+
+async def _bench(label, run, make_tools, runs):
+    lat, found = [], []
+    for _ in range(runs):
+        tools = make_tools()
+
+        async def resolved():
+            return tuple(tools)
+
+        detect._get_gmail_tools = resolved
+        t0 = time.perf_counter()
+        res = await run(tools)
+        lat.append(time.perf_counter() - t0)
+        found.append(len(res["interviews"]))
+    lat.sort()
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+    print(f"{label:<8} p50={statistics.median(lat):6.2f}s  p95={p95:6.2f}s  max={lat[-1]:6.2f}s  "
+          f"threads/run={statistics.mean(found):6.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=200)
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--server-capacity", type=int, default=4)
+    ap.add_argument("--base-ms", type=float, default=5.0)
+    ap.add_argument("--hang-rate", type=float, default=0.02)
+    ap.add_argument("--hang-s", type=float, default=8.0)
+    args = ap.parse_args()
+
+    mcp_client.get_mcp_tools_cached = _no_servers
+    detect.CALL_TIMEOUT = 1.0
+    detect.DEADLINE = 3.0
+    rng = random.Random(7)
+
+    def make_tools():
+        return _fake_tools(args.threads, args.server_capacity, args.base_ms, args.hang_rate, args.hang_s, rng)
+
+    async def after(tools):
+        return await detect.run_detect_interviews(incremental=False)
+
+    asyncio.run(_bench("before", _legacy_detect, make_tools, args.runs))
+    asyncio.run(_bench("after", after, make_tools, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_email_context.py
+"""
+Prompt size and content quality of the thread context on synthetic long
+recruiting threads, old blind cut vs the token-budgeted builder.
+
+  before: concatenate every message body, then [:16000]
+  after:  utils.email_context.build_email_context (PREP_CONTEXT_TOKENS budget)
+
+Each synthetic thread opens with an HTML email carrying the JD, every reply
+quotes the whole history and ends with a signature, and the newest message
+holds the interview time. We check whether the JD requirements and the
+newest message's interview time survive in the prompt. A short message with
+an early "Thanks," line checks that signature stripping keeps the facts
+written below it.
+
+Run from the repo root:
+    python -m benchmarks.bench_email_context [--messages 5 10 20 40] [--budget 4000]
+"""
+import argparse
+import time
+
+from utils.email_context import build_email_context, clean_body, estimate_tokens
+
+JD = ("<html><body><p>Hi Sam,</p><p>Thanks for applying to the Senior Backend Engineer role.</p>"
+      "<h3>Requirements</h3><ul><li>5+ years of Python</li><li>Experience with distributed queues"
+      " (REQ-KAFKA-7)</li><li>Postgres at scale</li></ul><p>Responsibilities include owning the ingest"
+      " pipeline.</p><p>Best,</p><p>Riley<br>Talent Partner, Acme<br>+1 555 0100</p></body></html>")
+EARLY_THANKS = ("Hi Alex,\nThanks,\nwe would like to move you forward. Your technical interview is scheduled"
+                " for Tue Oct 21 3pm PT.\nZoom: https://zoom.us/j/123\nBest,\nRiley")
+SIGNATURE = "\n\nBest,\nRiley Chen\nTalent Partner | Acme Corp\n+1 555 0100 | acme.com\nSent from my iPhone"
+
+
+def _thread(n: int):
+    msgs = [{"from": "riley@acme.com", "subject": "Acme - Senior Backend Engineer", "body": JD}]
+    history = JD
+    for i in range(1, n):
+        if i == n - 1:
+            own = "Confirmed: your onsite interview is Thursday 3:30pm PT (SLOT-FINAL-%d) on Zoom." % i
+        else:
+            own = "Following up (%d) - could you share your availability for next week? " % i + "Filler. " * 30
+        body = f"{own}{SIGNATURE}\n\nOn Mon, Riley <riley@acme.com> wrote:\n" + \
+               "\n".join("> " + line for line in history.splitlines())
+        msgs.append({"from": "riley@acme.com" if i % 2 else "sam@gmail.com", "subject": "Re: Acme", "body": body})
+        history = body
+    return msgs
+
+
+def _before(msgs):
+    parts = [f"From: {m['from']}\nSubject: {m['subject']}\n\n{m['body']}\n" for m in msgs]
+    return "\n\n---\n\n".join(parts)[:16000]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, nargs="+", default=[5, 10, 20, 40])
+    ap.add_argument("--budget", type=int, default=4000)
+    args = ap.parse_args()
+
+    print(f"{'msgs':>5} | {'before tok':>10} {'JD':>3} {'newest':>6} | {'after tok':>9} {'JD':>3} {'newest':>6} {'ms':>6}")
+    for n in args.messages:
+        msgs = _thread(n)
+        newest = "SLOT-FINAL-%d" % (n - 1)
+        old = _before(msgs)
+        t0 = time.perf_counter()
+        new, _stats = build_email_context(msgs, args.budget)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{n:>5} | {estimate_tokens(old):>10} {'yes' if 'REQ-KAFKA-7' in old else 'no':>3} "
+              f"{'yes' if newest in old else 'no':>6} | {estimate_tokens(new):>9} "
+              f"{'yes' if 'REQ-KAFKA-7' in new else 'no':>3} {'yes' if newest in new else 'no':>6} {ms:6.2f}")
+
+    body = clean_body(EARLY_THANKS)
+    kept = [fact for fact in ("3pm PT", "https://zoom.us/j/123") if fact in body]
+    print(f"\nearly 'Thanks,' sign-off: kept {len(kept)}/2 facts (interview time, Zoom link), "
+          f"signature {'dropped' if not body.endswith('Riley') else 'kept'}")
+
+
+if __name__ == "__main__":
+    main()
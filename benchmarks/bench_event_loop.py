@@ -0,0 +1,80 @@
+# benchmarks/bench_event_loop.py
+"""
+Requests/sec for the two ways a sync Flask handler can drive async code:
+
+  before: asyncio.run(handler())   -> new loop per request
+  after:  run_async(handler())     -> shared background loop
+
+It also replays the failure we see in production: a module-level
+asyncio.Lock (like the one guarding get_mcp_tools_cached) gets bound to the
+loop of the first request that contends on it, and the next request running
+on a different loop blows up with "bound to a different event loop".
+
+Run from the repo root:
+    python -m benchmarks.bench_event_loop [--requests 2000] [--threads 16]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.async_runtime import run_async, shutdown
+
+
+async def _handler(io_seconds: float) -> int:
+    await asyncio.sleep(io_seconds)  # stand-in for an MCP / model round trip
+    return 1
+
+
+def _drive(label: str, call, n: int, threads: int) -> None:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: call(), range(n)))
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<30} {n / elapsed:10.1f} req/s")
+
+
+_shared_lock = None
+
+
+async def _contend() -> None:
+    global _shared_lock
+    if _shared_lock is None:
+        _shared_lock = asyncio.Lock()
+
+    async def hold():
+        async with _shared_lock:
+            await asyncio.sleep(0)
+
+    await asyncio.gather(hold(), hold())
+
+
+def _cross_loop_check(label: str, call) -> None:
+    global _shared_lock
+    _shared_lock = None
+    try:
+        call()
+        call()
+        print(f"{label:<30} ok")
+    except RuntimeError as e:
+        print(f"{label:<30} FAILED: {e}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--io-ms", type=float, default=2.0)
+    args = ap.parse_args()
+    io = args.io_ms / 1000.0
+
+    _drive("before: asyncio.run/request", lambda: asyncio.run(_handler(io)), args.requests, args.threads)
+    _drive("after:  shared loop", lambda: run_async(_handler(io)), args.requests, args.threads)
+
+    _cross_loop_check("before: shared lock", lambda: asyncio.run(_contend()))
+    _cross_loop_check("after:  shared lock", lambda: run_async(_contend()))
+    shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/bench_json_parser.py
+"""
+Parse success rate and time on a corpus of messy LLM outputs, old extractor
+vs the tolerant single-pass parser. Every failure is one blocking round trip
+to the fixer model in the prep paths.
+
+  before: the original safe_extract_json (strict json.loads on the first
+          balanced block, brace counting that ignores string literals)
+  after:  utils.json_parser.safe_extract_json
+
+The corpus is built from a realistic prep brief mangled the ways models
+actually mangle JSON: fences, prose around it, trailing commas, single
+quotes, unquoted keys, comments, Python literals, braces inside strings and
+output truncated at random points, plus prose with [bracketed] asides
+before the object.
+
+Run from the repo root:
+    python -m benchmarks.bench_json_parser [--truncated 200] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from utils.json_parser import safe_extract_json
+
+PLAN = {
+    "company": "Acme",
+    "role": "Senior Backend Engineer",
+    "company_snapshot": {"summary": "Acme builds {real-time} ingest pipelines for logistics.",
+                         "products": ["Tracker", "Relay"], "website": "https://acme.com/about"},
+    "jd_summary": {"responsibilities": ["Own the ingest service", "Mentor two engineers"],
+                   "requirements": ["5+ years Python", "Kafka or Pulsar", "Postgres at scale"]},
+    "core_topics": {"must_know": ["idempotent consumers", "backpressure"], "refresh": ["B-tree indexes"]},
+    "behavioral": {"stories_to_prepare": ["A migration you led", "A disagreement on design"]},
+    "questions_to_ask": ["How is on-call structured?", "What does success look like in 6 months?"],
+    "tech_stack": ["Python", "Kafka", "Postgres", "Kubernetes"],
+    "resources": [{"title": "Kafka docs", "url": "https://kafka.apache.org/documentation/"}],
+    "next_actions": ["Reply with availability"],
+    "schedule_suggestion": [{"day": "Mon", "focus": "system design"}],
+    "news": [{"title": "Acme raises Series C", "url": "https://news.example.com/acme"}],
+    "team": [{"name": "Riley Chen", "title": "Engineering Manager"}],
+}
+
+
+# ---------- old implementation (verbatim behaviour, for comparison) ----------
+
+def _old_strip_code_fences(s: str) -> str:
+    s = s.strip()
+    if s.startswith("```"):
+        s = re.sub(r"^```(?:json|javascript|js|python)?\s*", "", s, flags=re.IGNORECASE)
+        s = re.sub(r"\s*```$", "", s)
+    return s.strip()
+
+
+def _old_load(s: str) -> Optional[Any]:
+    try:
+        return json.loads(s)
+    except Exception:
+        return None
+
+
+def _old_balanced(s: str, opener: str, closer: str) -> Optional[str]:
+    start = s.find(opener)
+    if start == -1:
+        return None
+    depth = 0
+    for i in range(start, len(s)):
+        if s[i] == opener:
+            depth += 1
+        elif s[i] == closer:
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
+
+def old_safe_extract_json(text: str):
+    direct = _old_load(text)
+    if direct is not None:
+        return direct
+    s = _old_strip_code_fences(text)
+    direct = _old_load(s)
+    if direct is not None:
+        return direct
+    for opener, closer in (("{", "}"), ("[", "]")):
+        block = _old_balanced(s, opener, closer)
+        if block:
+            parsed = _old_load(block)
+            if parsed is not None:
+                return parsed
+    m = re.search(r"\{.*?\}", s, flags=re.DOTALL)
+    if m:
+        parsed = _old_load(m.group(0))
+        if parsed is not None:
+            return parsed
+    raise ValueError("No valid JSON found in the string")
+
+
+# ---------- corpus ----------
+
+def _corpus(n_truncated: int, seed: int = 7) -> List[Tuple[str, str, bool]]:
+    """(category, text, complete); complete=False for truncated output."""
+    rnd = random.Random(seed)
+    pretty = json.dumps(PLAN, indent=2)
+    compact = json.dumps(PLAN)
+    trailing = re.sub(r"(\"|\]|\}|\d)(\n\s*[\]\}])", r"\1,\2", pretty)
+    single = pretty.replace("'", "").replace('"', "'")
+    unquoted = re.sub(r'"(\w+)":', r"\1:", pretty)
+    python_lit = pretty.replace(": null", ": None").replace("true", "True")
+    commented = pretty.replace('"company": "Acme",', '"company": "Acme", // from the subject line')
+
+    out = [
+        ("clean", pretty, True),
+        ("clean", compact, True),
+        ("fenced", f"```json\n{pretty}\n```", True),
+        ("prose", f"Here is the brief you asked for:\n\n{pretty}\n\nLet me know if you need more.", True),
+        ("prose+fence", f"Sure!\n```json\n{pretty}\n```\nHope this helps.", True),
+        ("trailing commas", trailing, True),
+        ("single quotes", single, True),
+        ("unquoted keys", unquoted, True),
+        ("python literals", python_lit, True),
+        ("comments", commented, True),
+        ("braces in prose", f"I used {{company}} from the thread. {pretty}", True),
+        ("fenced+trailing", f"```json\n{trailing}\n```", True),
+        ("brackets in prose", f"Note (see [1]) then {compact}", True),
+        ("brackets in prose", f"Sure! Based on [the thread], here is the JSON:\n{pretty}", True),
+        ("brackets in prose", f"Sure! Based on [the thread], here is the JSON:\n{trailing}", True),
+    ]
+    for _ in range(n_truncated):
+        cut = rnd.randint(len(pretty) // 3, len(pretty) - 2)
+        out.append(("truncated", f"```json\n{pretty[:cut]}", False))
+    return out
+
+
+def _run(parse: Callable[[str], Any], corpus, repeat: int):
+    ok, exact, per_cat = 0, 0, {}
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for cat, text, complete in corpus:
+            try:
+                value = parse(text)
+                good = isinstance(value, dict) and value.get("company") == "Acme"
+            except Exception:
+                value, good = None, False
+            if _ == 0:
+                ok += good
+                exact += bool(complete and value == PLAN)
+                c = per_cat.setdefault(cat, [0, 0])
+                c[0] += good
+                c[1] += 1
+    us = (time.perf_counter() - t0) * 1e6 / (repeat * len(corpus))
+    return ok, exact, per_cat, us
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--truncated", type=int, default=200, help="number of randomly truncated samples")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    corpus = _corpus(args.truncated)
+    complete = sum(1 for c in corpus if c[2])
+    before = _run(old_safe_extract_json, corpus, args.repeat)
+    after = _run(safe_extract_json, corpus, args.repeat)
+
+    print(f"corpus: {len(corpus)} samples ({complete} complete, {len(corpus) - complete} truncated)\n")
+    print(f"{'category':>18} | {'before':>8} | {'after':>8}")
+    for cat in before[2]:
+        b, a = before[2][cat], after[2][cat]
+        print(f"{cat:>18} | {b[0]:>3}/{b[1]:<4} | {a[0]:>3}/{a[1]:<4}")
+    print()
+    for label, (ok, exact, _, us) in (("before", before), ("after", after)):
+        print(f"{label:>6}: parsed {ok}/{len(corpus)} ({ok / len(corpus):.0%}), "
+              f"exact on complete {exact}/{complete}, fixer calls {len(corpus) - ok}, {us:.1f} us/parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_llm_pool.py
+"""
+Startup and per-request overhead of building model clients and ReAct graphs,
+measured with a fake chat model so no network or API key is involved.
+
+  before: init model + create_react_agent on every request (old code path)
+  after:  llm_pool.get_react_agent() (pooled client, graph cached per tool set)
+
+The fake "client" sleeps --init-ms on construction to stand in for the real
+client's channel/auth setup; set it to 0 to measure pure graph compile cost.
+
+Run from the repo root:
+    python -m benchmarks.bench_llm_pool [--requests 200] [--init-ms 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import warnings
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+import llm_pool
+import mcp_client
+
+warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+
+class _FakeChat(FakeMessagesListChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def lookup(query: str) -> str:
+    """Fake web lookup."""
+    return "ok"
+
+
+_TOOLS = [lookup]
+
+
+def _make_factory(init_ms: float):
+    def factory(model, provider):
+        time.sleep(init_ms / 1000)
+        return _FakeChat(responses=[AIMessage(content='{"company": "Acme"}')])
+    return factory
+
+
+async def _fake_tools():
+    return _TOOLS
+
+
+async def _one(agent) -> None:
+    await agent.ainvoke({"messages": [HumanMessage("prep Acme")]})
+
+
+async def _bench(label, get_agent, n):
+    lat = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await _one(await get_agent())
+        lat.append((time.perf_counter() - t0) * 1000)
+    print(f"{label:<8} mean={statistics.mean(lat):7.2f}ms  p50={statistics.median(lat):7.2f}ms  "
+          f"total={sum(lat) / 1000:6.2f}s")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--init-ms", type=float, default=30.0)
+    args = ap.parse_args()
+
+    factory = _make_factory(args.init_ms)
+    llm_pool.get_mcp_tools_cached = _fake_tools
+    mcp_client._tools_version = 1
+    llm_pool.set_model_factory(factory)
+
+    async def legacy():
+        return create_react_agent(factory(llm_pool.PRO_MODEL, llm_pool.PROVIDER), _TOOLS)
+
+    async def run():
+        await _bench("before", legacy, args.requests)
+        t0 = time.perf_counter()
+        await llm_pool.warm_up()
+        print(f"warm-up  {(time.perf_counter() - t0) * 1000:7.2f}ms (one-off, at startup)")
+        await _bench("after", llm_pool.get_react_agent, args.requests)
+        print("pool", llm_pool.pool_stats())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
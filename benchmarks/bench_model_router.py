@@ -0,0 +1,131 @@
+# benchmarks/bench_model_router.py
+"""
+Brief latency and model cost per prep run, by routing policy, using the
+scripted fake model (benchmarks/fake_llm.py) with a slow "pro" and a fast
+"flash" tier, and fake Gmail/web tools (no network, no API key).
+
+  before: PREP_MODEL_POLICY=pro     (every ReAct turn on the pro model)
+  after:  PREP_MODEL_POLICY=tiered  (tool turns on the fast model; a pro
+          synthesis turn only when the draft has empty required sections)
+
+--sparse-rate is the share of fast-model drafts that come back with most
+sections empty, i.e. the escalation rate to expect. Cost uses per-million
+token prices (defaults are illustrative list prices; pass your own).
+
+Run from the repo root:
+    python -m benchmarks.bench_model_router [--threads 40] [--pro-ms 150] [--fast-ms 45] [--sparse-rate 0.2]
+"""
+import os
+
+os.environ["PREP_CACHE_DISABLE"] = "1"
+os.environ["PREP_PREFETCH"] = "0"
+
+import argparse
+import asyncio
+import statistics
+import time
+import warnings
+
+from langchain_core.tools import tool
+
+import llm_pool
+import mcp_client
+import agent.prep_agent as prep_agent
+from benchmarks.fake_llm import ScriptedChatModel
+
+warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--pro-ms", type=float, default=150.0, help="pro model latency per turn")
+    ap.add_argument("--fast-ms", type=float, default=45.0, help="fast model latency per turn")
+    ap.add_argument("--tool-ms", type=float, default=60.0)
+    ap.add_argument("--tool-steps", type=int, default=3)
+    ap.add_argument("--sparse-rate", type=float, default=0.2)
+    ap.add_argument("--pro-price", default="1.25,10", help="USD per 1M tokens: input,output")
+    ap.add_argument("--fast-price", default="0.30,2.50")
+    args = ap.parse_args()
+    prices = {llm_pool.PRO_MODEL: [float(x) for x in args.pro_price.split(",")],
+              llm_pool.FAST_MODEL: [float(x) for x in args.fast_price.split(",")],
+              llm_pool.FIXER_MODEL: [float(x) for x in args.fast_price.split(",")]}
+
+    threads = {f"t{i}": {"messages": [{"from": f"Recruiter <talent@company{i}.com>", "subject": "Role: Engineer",
+                                       "body": f"Interview for the Engineer role. https://company{i}.com/jobs/eng-{i}"}]}
+               for i in range(args.threads)}
+
+    @tool
+    async def get_thread(thread_id: str) -> dict:
+        """Fake Gmail thread fetch."""
+        return threads[thread_id]
+
+    @tool
+    async def firecrawl_search(query: str) -> str:
+        """Fake web search."""
+        await asyncio.sleep(args.tool_ms / 1000)
+        return f"results for {query}"
+
+    async def gmail_tools():
+        return None, get_thread
+
+    async def web_tools():
+        return [firecrawl_search]
+
+    prep_agent._get_gmail_tools = gmail_tools
+    llm_pool.get_mcp_tools_cached = mcp_client.get_mcp_tools_cached = web_tools
+    mcp_client._tools_version = 1
+
+    def factory(model, provider):
+        pro = model == llm_pool.PRO_MODEL
+        return ScriptedChatModel(model=model, latency_ms=args.pro_ms if pro else args.fast_ms,
+                                 tool_steps=args.tool_steps, sparse_rate=0.0 if pro else args.sparse_rate)
+
+    def snapshot():
+        return {m: (v["calls"], v["prompt_tokens"], v["completion_tokens"])
+                for m, v in llm_pool.route_stats()["models"].items()}
+
+    async def run(policy: str):
+        llm_pool.POLICY = policy
+        llm_pool.set_model_factory(factory)
+        before, runs0, esc0 = snapshot(), llm_pool.route_stats()["runs"], llm_pool.route_stats()["escalated"]
+        sem = asyncio.Semaphore(args.concurrency)
+        lat, empty = [], 0
+
+        async def one(tid):
+            nonlocal empty
+            async with sem:
+                t0 = time.perf_counter()
+                plan = await prep_agent.run_prep_from_thread(tid)
+                lat.append((time.perf_counter() - t0) * 1000)
+                empty += len(prep_agent._empty_sections(plan, prep_agent.THREAD_REQUIRED))
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(t) for t in threads))
+        wall = time.perf_counter() - t0
+        after, cost, calls = snapshot(), 0.0, {}
+        for m, (n, p, c) in after.items():
+            n0, p0, c0 = before.get(m, (0, 0, 0))
+            price_in, price_out = prices.get(m, (0.0, 0.0))
+            cost += ((p - p0) * price_in + (c - c0) * price_out) / 1e6
+            calls[m] = n - n0
+        stats = llm_pool.route_stats()
+        lat.sort()
+        print(f"{policy:<7} p50={statistics.median(lat):7.1f}ms  p95={lat[int(len(lat) * 0.95) - 1]:7.1f}ms  "
+              f"{len(threads) / wall * 60:6.1f} briefs/min  cost/brief=${cost / len(threads):.5f}  "
+              f"escalated={stats['escalated'] - esc0}/{stats['runs'] - runs0}  empty sections left={empty}")
+        print(f"        model calls: {calls}")
+
+    print(f"{args.threads} briefs, {args.concurrency} at a time, pro {args.pro_ms} ms/turn, "
+          f"fast {args.fast_ms} ms/turn, {args.tool_steps} tool steps, sparse drafts {args.sparse_rate:.0%}")
+
+    async def both():
+        await run("pro")
+        await run("tiered")
+
+    asyncio.run(both())
+
+
+if __name__ == "__main__":
+    main()
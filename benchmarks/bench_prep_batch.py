@@ -0,0 +1,155 @@
+# benchmarks/bench_prep_batch.py
+"""
+Briefs per minute for a day's interview list, one request per thread vs the
+batch endpoint, using a scripted fake model, fake Gmail and web tools (no
+network, no API key).
+
+  before: run_prep_from_thread per thread, PREP_JOB_WORKERS at a time (what
+          the frontend's one-call-per-interview loop amounts to)
+  after:  agent.prep_batch.run_prep_batch(all thread ids)
+
+The fake agent spends one model turn plus one web call per research step:
+a full thread brief does --company-steps of company research plus
+--role-steps of JD/role work; a batched thread only does the role steps and
+each company's research runs once. Caches and prefetch are disabled so every
+brief is generated.
+
+Run from the repo root:
+    python -m benchmarks.bench_prep_batch [--threads 12] [--companies 4] [--llm-ms 40] [--tool-ms 60]
+"""
+import os
+
+os.environ["PREP_CACHE_DISABLE"] = "1"
+os.environ["RESEARCH_CACHE_DISABLE"] = "1"
+os.environ["PREP_PREFETCH"] = "0"
+
+import argparse
+import asyncio
+import json
+import time
+import warnings
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+
+import llm_pool
+import mcp_client
+import agent.prep_agent as prep_agent
+import agent.prep_batch as prep_batch
+
+warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+ARGS = argparse.Namespace(llm_ms=40.0, tool_ms=60.0, company_steps=3, role_steps=1)
+COUNTS = {"llm": 0, "tool": 0}
+
+
+@tool
+async def web_search(query: str) -> str:
+    """Fake web search."""
+    COUNTS["tool"] += 1
+    await asyncio.sleep(ARGS.tool_ms / 1000)
+    return f"results for {query}"
+
+
+class _ScriptedChat(BaseChatModel):
+    """Calls web_search N times (N depends on the prompt), then answers with JSON."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        COUNTS["llm"] += 1
+        await asyncio.sleep(ARGS.llm_ms / 1000)
+        prompt = "\n".join(str(m.content) for m in messages if not isinstance(m, (AIMessage, ToolMessage)))
+        if "Tasks:" in prompt:  # company research prompt
+            steps = ARGS.company_steps
+        elif "handled separately" in prompt:  # batched thread: role only
+            steps = ARGS.role_steps
+        else:
+            steps = ARGS.company_steps + ARGS.role_steps
+        done = sum(1 for m in messages if isinstance(m, ToolMessage))
+        if done < steps:
+            msg = AIMessage(content="", tool_calls=[{"name": "web_search", "args": {"query": f"step {done}"},
+                                                     "id": f"call-{done}"}])
+        else:
+            msg = AIMessage(content=json.dumps({"company": "X", "role": "Engineer", "snapshot": "s",
+                                                "news": [{"title": "n"}], "team": [], "tech_stack": ["Python"],
+                                                "jd_summary": {"summary": "jd"}}))
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+
+def _threads(n: int, companies: int):
+    out = {}
+    for i in range(n):
+        c = f"company{i % companies}"
+        out[f"t{i}"] = {"messages": [{"from": f"Recruiter <talent@{c}.com>", "subject": "Role: Engineer",
+                                      "body": f"Interview for the Engineer role at {c}. https://{c}.com/jobs/eng-{i}"}]}
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=12)
+    ap.add_argument("--companies", type=int, default=4)
+    ap.add_argument("--llm-ms", type=float, default=40.0)
+    ap.add_argument("--tool-ms", type=float, default=60.0)
+    ap.add_argument("--company-steps", type=int, default=3)
+    ap.add_argument("--role-steps", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=4, help="concurrent agent runs (both modes)")
+    ap.parse_args(namespace=ARGS)
+
+    threads = _threads(ARGS.threads, ARGS.companies)
+
+    @tool
+    async def get_thread(thread_id: str) -> dict:
+        """Fake Gmail thread fetch."""
+        return threads[thread_id]
+
+    async def gmail_tools():
+        return None, get_thread
+
+    async def fake_tools():
+        return [web_search]
+
+    prep_agent._get_gmail_tools = gmail_tools
+    llm_pool.get_mcp_tools_cached = mcp_client.get_mcp_tools_cached = fake_tools
+    mcp_client._tools_version = 1
+    llm_pool.set_model_factory(lambda model, provider: _ScriptedChat())
+    llm_pool.POLICY = "pro"  # one model for every turn; routing is measured in bench_model_router
+    prep_batch.BATCH_CONCURRENCY = ARGS.workers
+
+    async def per_thread():
+        sem = asyncio.Semaphore(ARGS.workers)
+
+        async def one(tid):
+            async with sem:
+                return await prep_agent.run_prep_from_thread(tid)
+        return await asyncio.gather(*(one(t) for t in threads))
+
+    async def run():
+        for label, fn in (("before", per_thread), ("after", lambda: prep_batch.run_prep_batch(list(threads)))):
+            COUNTS.update(llm=0, tool=0)
+            t0 = time.perf_counter()
+            await fn()
+            s = time.perf_counter() - t0
+            print(f"{label:<7} {s:6.2f}s  {len(threads) / s * 60:7.1f} briefs/min  "
+                  f"model turns={COUNTS['llm']:<4} web calls={COUNTS['tool']}")
+
+    print(f"{ARGS.threads} threads across {ARGS.companies} companies, {ARGS.workers} concurrent agent runs")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_stream_parser.py
+"""
+Cost of pulling completed sections out of a streamed prep plan, old
+rescan-per-chunk vs the incremental parser, on outputs up to several MB.
+
+  before: append each chunk to a buffer and rescan the whole buffer for
+          closed top-level members (the old _completed_sections)
+  after:  utils.json_parser.StreamingJSONObject.feed(chunk)
+
+The plan is padded with large string and array values so the output
+reaches the target size. The old path is quadratic in output size, so
+it is skipped above --old-max-kb.
+
+Run from the repo root:
+    python -m benchmarks.bench_stream_parser [--sizes-kb 16 64 256 1024 4096] [--chunk 64]
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from utils.json_parser import StreamingJSONObject
+from benchmarks.bench_json_parser import PLAN
+
+
+def _old_completed_sections(text: str) -> Dict[str, Any]:
+    start = text.find("{")
+    out: Dict[str, Any] = {}
+    if start == -1:
+        return out
+    depth, in_str, esc = 0, False, False
+    key, key_start, val_start = None, None, None
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+                if depth == 1 and key is None and key_start is not None:
+                    key = text[key_start + 1:i]
+            continue
+        if ch == '"':
+            in_str = True
+            if depth == 1 and key is None:
+                key_start = i
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                if key is not None and val_start is not None:
+                    _old_add(out, key, text[val_start:i])
+                break
+        elif depth == 1 and ch == ":" and key is not None and val_start is None:
+            val_start = i + 1
+        elif depth == 1 and ch == ",":
+            if key is not None and val_start is not None:
+                _old_add(out, key, text[val_start:i])
+            key, key_start, val_start = None, None, None
+    return out
+
+
+def _old_add(out: Dict[str, Any], key: str, raw: str) -> None:
+    try:
+        out[key] = json.loads(raw)
+    except ValueError:
+        pass
+
+
+def _output(size_kb: int) -> str:
+    plan = dict(PLAN)
+    filler = max(0, size_kb * 1024 - len(json.dumps(plan)))
+    plan["company_snapshot"] = {**plan["company_snapshot"], "summary": "Acme \"ships\" {fast}. " * (filler // 44)}
+    plan["resources"] = [{"title": f"doc {i}", "url": f"https://acme.com/{i}"} for i in range(filler // 88)]
+    return "```json\n" + json.dumps(plan, indent=1) + "\n```"
+
+
+def _chunks(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _run_old(chunks: List[str]):
+    t0 = time.perf_counter()
+    buffer, seen = "", set()
+    for c in chunks:
+        buffer += c
+        seen.update(_old_completed_sections(buffer))
+    return (time.perf_counter() - t0) * 1000, len(seen)
+
+
+def _run_new(chunks: List[str]):
+    t0 = time.perf_counter()
+    parser, seen = StreamingJSONObject(), set()
+    for c in chunks:
+        for k, _ in parser.feed(c):
+            seen.add(k)
+    return (time.perf_counter() - t0) * 1000, len(seen)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes-kb", type=int, nargs="+", default=[16, 64, 256, 1024, 4096])
+    ap.add_argument("--chunk", type=int, default=64, help="characters per streamed chunk")
+    ap.add_argument("--old-max-kb", type=int, default=64)
+    args = ap.parse_args()
+
+    print(f"{'size':>8} {'chunks':>8} | {'before ms':>10} | {'after ms':>9} {'MB/s':>7} | sections")
+    for kb in args.sizes_kb:
+        text = _output(kb)
+        chunks = _chunks(text, args.chunk)
+        new_ms, new_n = _run_new(chunks)
+        if kb <= args.old_max_kb:
+            old_ms, old_n = _run_old(chunks)
+            old = f"{old_ms:>10.1f}"
+            assert old_n == new_n, (old_n, new_n)
+        else:
+            old = f"{'skipped':>10}"
+        mbps = len(text) / 1e6 / (new_ms / 1000)
+        print(f"{len(text) // 1024:>6}KB {len(chunks):>8} | {old} | {new_ms:>9.1f} {mbps:>7.1f} | {new_n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_web_cache.py
+"""
+Firecrawl calls and time spent on web tools across many prep runs, against
+the stub Firecrawl MCP server (benchmarks/fake_mcp_server.py --role web),
+loaded through mcp_client exactly like the app does.
+
+Each simulated prep run scrapes the company homepage and careers page and
+searches for news, the way the prefetch step and the ReAct agent do. Popular
+companies come up again and again (Zipf-like draw), and the same page
+arrives in the shapes it takes in real mail: tracking params, upper-case
+host, trailing slash; queries differ in case and spacing.
+
+  before: WEB_CACHE_DISABLE=1  (every call goes to Firecrawl)
+  after:  utils.web_cache      (normalized keys, compressed on-disk store)
+
+Reports upstream calls, p50/p95 web time per run, hit rate, bytes served
+from cache and the compression ratio on disk.
+
+Run from the repo root:
+    python -m benchmarks.bench_web_cache [--runs 120] [--companies 15] [--latency-ms 400] [--page-chars 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mcp_server.py")
+
+
+def _configure(args: argparse.Namespace, workdir: str) -> None:
+    """Environment for the app modules; must run before they are imported."""
+    servers = {"firecrawl-mcp": {"transport": "stdio", "command": sys.executable,
+                                 "args": [SERVER, "--role", "web", "--latency-ms", str(args.latency_ms),
+                                          "--page-chars", str(args.page_chars), "--jitter", "0.3"]}}
+    path = os.path.join(workdir, "mcp_servers.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(servers, f)
+    os.environ.update(MCP_SERVERS_FILE=path, PREPHUB_CACHE_DIR=workdir)
+
+
+def _workload(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    names = [f"Company{i}" for i in range(args.companies)]
+    weights = [1 / (i + 1) for i in range(args.companies)]
+    runs = []
+    for n in range(args.runs):
+        name = rng.choices(names, weights)[0]
+        domain = name.lower() + ".com"
+        host = domain.upper() if rng.random() < 0.3 else domain
+        runs.append([
+            ("web.scrape", {"url": f"https://{domain}/"}),
+            ("web.scrape", {"url": f"https://{host}/careers/?utm_source=email&utm_campaign=c{n}"}),
+            ("web.search", {"query": rng.choice([f"{name} news", f"{name.lower()}  news", f"{name} NEWS"])}),
+        ])
+    return runs
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=120)
+    ap.add_argument("--companies", type=int, default=15)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--latency-ms", type=float, default=400.0, help="stub Firecrawl latency per call")
+    ap.add_argument("--page-chars", type=int, default=20000, help="scraped page size")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="prephub-webcache-")
+    _configure(args, workdir)
+
+    import mcp_client
+    from utils.tool_args import call_tool
+    from utils.web_cache import get_web_cache
+
+    runs = _workload(args)
+
+    async def one_pass(label: str):
+        sem = asyncio.Semaphore(args.concurrency)
+        per_run = []
+
+        async def run(calls):
+            async with sem:
+                t0 = time.perf_counter()
+                for cap, payload in calls:
+                    await call_tool(await mcp_client.get_tool(cap), payload)
+                per_run.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(run(c) for c in runs))
+        wall = time.perf_counter() - t0
+        per_run.sort()
+        return {"label": label, "wall_s": wall, "p50": statistics.median(per_run),
+                "p95": per_run[max(0, int(len(per_run) * 0.95) - 1)]}
+
+    async def both():
+        await mcp_client.get_mcp_tools_cached()  # start the stub server once, outside the timings
+        os.environ["WEB_CACHE_DISABLE"] = "1"
+        before = await one_pass("before")
+        os.environ.pop("WEB_CACHE_DISABLE")
+        after = await one_pass("after")
+        return before, after
+
+    before, after = asyncio.run(both())
+    stats = get_web_cache().stats()
+    calls = sum(len(r) for r in runs)
+    print(f"{args.runs} prep runs over {args.companies} companies, {calls} web calls, "
+          f"{args.latency_ms} ms/call, {args.page_chars} chars/page, {args.concurrency} at a time")
+    for r, upstream in ((before, calls), (after, stats["misses"])):
+        print(f"{r['label']:<7} firecrawl calls={upstream:4d}  wall={r['wall_s']:6.2f}s  "
+              f"web time per run p50={r['p50']:7.1f}ms p95={r['p95']:7.1f}ms")
+    print(f"cache: hit_rate={stats['hit_rate']:.1%}  joined={stats['joined']}  bytes_saved={stats['bytes_saved']:,}  "
+          f"entries={stats['entries']} blobs={stats['blobs']}  on disk={stats['stored_bytes']:,} B "
+          f"(raw {stats['raw_bytes']:,} B, x{stats['compression_ratio']})")
+    print("by tool:", stats["by_tool"])
+
+
+if __name__ == "__main__":
+    main()
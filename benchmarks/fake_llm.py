@@ -0,0 +1,136 @@
+# benchmarks/fake_llm.py
+"""
+Scripted stand-in for the Gemini chat models, for offline load tests.
+
+ScriptedChatModel sleeps `latency_ms` per turn, makes `tool_steps` web tool
+calls (scrape the URLs in the prompt, then search), then answers
+with JSON shaped for the prompt it got: company research, a section
+sub-agent, a thread prep plan, or a repair request from the fixer model.
+A `malformed_rate` share of final answers is fenced, prose-wrapped JSON with
+trailing commas (the tolerant parser's job); a `broken_rate` share carries
+no JSON at all, which forces the fixer-model round trip, and a `sparse_rate`
+share is valid JSON with most sections left empty (what triggers model
+escalation). Choices are seeded from the prompt, so a given request always
+takes the same path.
+
+    llm_pool.set_model_factory(lambda model, provider: ScriptedChatModel(model=model, latency_ms=40))
+"""
+import asyncio
+import json
+import random
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_URL_RE = re.compile(r"https?://[^\s)>\]\"'<]+")
+_HINT_RE = re.compile(r"(company_guess|role_guess|Company|Role):\s*(.+)")
+
+
+def _text(m: BaseMessage) -> str:
+    return m.content if isinstance(m.content, str) else json.dumps(m.content, default=str)
+
+
+def _plan(company: str, role: str) -> Dict[str, Any]:
+    return {
+        "company": company, "role": role,
+        "company_snapshot": f"{company} builds developer infrastructure.",
+        "jd_summary": {"summary": f"{role} on the platform team",
+                       "responsibilities": ["own services", "on-call"], "requirements": ["python", "sql"]},
+        "core_topics": {"must_know": ["system design", "python"], "refresh": ["sql"]},
+        "behavioral": {"stories_to_prepare": ["conflict", "ownership"]},
+        "questions_to_ask": ["How is on-call organised?"],
+        "tech_stack": ["Python", "Postgres", "Kubernetes"],
+        "resources": [{"title": "Engineering blog", "url": "https://example.com/blog"}],
+        "next_actions": ["Confirm the interview slot"],
+        "schedule_suggestion": [{"day": "D-1", "focus": "system design"}],
+        "news": [{"title": f"{company} raises Series B", "url": "https://news.example.com/1", "why_it_matters": "growth"}],
+        "team": [{"name": "A. Founder", "role": "CTO", "source": "https://example.com/team"}],
+    }
+
+
+def _research(company: str, role: str) -> Dict[str, Any]:
+    return {"company": company, "role": role, "snapshot": f"{company} builds developer infrastructure.",
+            "news": [{"title": f"{company} raises Series B", "url": "https://news.example.com/1",
+                      "why_it_matters": "growth"}],
+            "team": [{"name": "A. Founder", "role": "CTO", "source": "https://example.com/team"}],
+            "tech_stack": ["Python", "Postgres"]}
+
+
+class ScriptedChatModel(BaseChatModel):
+    model: str = "scripted"
+    latency_ms: float = 40.0
+    tool_steps: int = 2
+    malformed_rate: float = 0.0
+    broken_rate: float = 0.0
+    sparse_rate: float = 0.0
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [getattr(t, "name", None) or (t.get("name") if isinstance(t, dict) else str(t)) for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError("async only")
+
+    def _tool_call(self, prompt: str, step: int) -> Optional[Dict[str, Any]]:
+        scrape = next((n for n in self.tool_names if "scrape" in n.lower()), None)
+        search = next((n for n in self.tool_names if "search" in n.lower() and "email" not in n.lower()), None)
+        urls = _URL_RE.findall(prompt)
+        if scrape and step < len(urls):
+            return {"name": scrape, "args": {"url": urls[step]}, "id": f"call-{step}"}
+        if search:
+            return {"name": search, "args": {"query": f"{prompt[:40]} step {step}"}, "id": f"call-{step}"}
+        return None
+
+    def _answer(self, prompt: str) -> Dict[str, Any]:
+        hints = {k.lower(): v.strip() for k, v in _HINT_RE.findall(prompt)}
+        company = hints.get("company_guess") or hints.get("company") or "Unknown Co"
+        role = hints.get("role_guess") or hints.get("role") or "Engineer"
+        if prompt.startswith("Rewrite the following"):  # company-research fixer
+            return _research(company, role)
+        if prompt.startswith("Convert to STRICT JSON"):  # thread-plan fixer
+            return _plan(company, role)
+        section = re.search(r"Task: (\w[\w ]*?)[:(]", prompt)
+        if section and "Tasks:" not in prompt:  # one section sub-agent
+            key = {"Company snapshot": "snapshot", "Recent news": "news", "Team highlights": "team",
+                   "Tech stack hints": "tech_stack"}.get(section.group(1).strip(), "snapshot")
+            return {key: _research(company, role)[key]}
+        if "Tasks:" in prompt:
+            return _research(company, role)
+        return _plan(company, role)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        prompt = "\n".join(_text(m) for m in messages if not isinstance(m, (AIMessage, ToolMessage)))
+        done = sum(1 for m in messages if isinstance(m, ToolMessage))
+        call = self._tool_call(prompt, done) if done < self.tool_steps and self.tool_names else None
+        if call is not None:
+            msg = AIMessage(content="", tool_calls=[call])
+        else:
+            # a repair request always gets clean JSON back
+            repair = prompt.startswith(("Rewrite the following", "Convert to STRICT JSON"))
+            answer = self._answer(prompt)
+            roll = 1.0 if repair else random.Random(zlib.crc32(prompt.encode("utf-8"))).random()
+            if not repair and roll > 1 - self.sparse_rate:
+                keep = ("company", "role", "tech_stack")
+                answer = {k: (v if k in keep else type(v)()) for k, v in answer.items()}
+            body = json.dumps(answer)
+            if roll < self.broken_rate:
+                body = "Sorry, I ran out of room before writing the brief."
+            elif roll < self.broken_rate + self.malformed_rate:
+                body = "Here is the brief:\n```json\n" + body[:-1] + ",}\n```\nLet me know if you need more."
+            msg = AIMessage(content=body)
+        tokens_in = sum(len(_text(m)) for m in messages) // 4
+        msg.usage_metadata = {"input_tokens": tokens_in, "output_tokens": len(str(msg.content)) // 4 + 8,
+                              "total_tokens": tokens_in + len(str(msg.content)) // 4 + 8}
+        return ChatResult(generations=[ChatGeneration(message=msg)])
@@ -0,0 +1,144 @@
+# benchmarks/fake_mcp_server.py
+"""
+Stub MCP stdio server for offline load tests: a synthetic Gmail inbox or a
+synthetic Firecrawl, with configurable size and latency. Only needs the
+`mcp` package, so it can be launched with any interpreter that has it.
+
+    python benchmarks/fake_mcp_server.py --role gmail --inbox 200 --latency-ms 20
+    python benchmarks/fake_mcp_server.py --role web --latency-ms 150 --page-chars 8000
+
+The inbox is generated from --seed, so every run (and every server process
+with the same arguments) serves the same threads. A --interview-ratio share
+of them are recruiting threads (subject with "Role: ...", JD / careers /
+scheduling links in the body); the rest are newsletters that detection
+should drop. benchmarks/load_test.py wires both roles in through
+MCP_SERVERS_FILE.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from mcp.server.fastmcp import FastMCP
+
+COMPANIES = ["Acme Robotics", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries",
+             "Wayne Tech", "Soylent", "Vandelay", "Tyrell", "Cyberdyne", "Massive Dynamic"]
+ROLES = ["Backend Engineer", "Senior Software Engineer", "Data Engineer", "ML Engineer",
+         "Site Reliability Engineer", "Frontend Engineer", "Staff Engineer"]
+STAGES = ["Interview invitation", "Phone screen", "Onsite interview", "Next steps", "Take-home assessment"]
+NOISE = ["Weekly newsletter", "Career tips for you", "Your receipt", "Product update", "Team offsite photos"]
+PAGE_SIZE = 25
+
+
+def _domain(company: str) -> str:
+    return company.lower().replace(" ", "") + ".com"
+
+
+def _filler(rng: random.Random, chars: int) -> str:
+    words = ["team", "platform", "scale", "customers", "reliability", "latency", "roadmap", "python",
+             "distributed", "systems", "ownership", "mentoring", "growth", "product", "data", "impact"]
+    out: List[str] = []
+    n = 0
+    while n < chars:
+        w = rng.choice(words)
+        out.append(w)
+        n += len(w) + 1
+    return " ".join(out)
+
+
+def make_inbox(size: int, seed: int, interview_ratio: float, body_chars: int) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    now = time.time()
+    inbox: Dict[str, Dict[str, Any]] = {}
+    for i in range(size):
+        tid = f"thread{i:05d}"
+        sent = now - rng.uniform(0, 40 * 86400)
+        if rng.random() < interview_ratio:
+            company, role = rng.choice(COMPANIES), rng.choice(ROLES)
+            domain = _domain(company)
+            subject = f"{rng.choice(STAGES)} - Role: {role}"
+            body = (f"Hi, thanks for your interest in the {role} role at {company}. "
+                    f"We'd like to schedule an interview. Job description: "
+                    f"https://boards.greenhouse.io/{domain.split('.')[0]}/jobs/{1000 + i} "
+                    f"Careers: https://{domain}/careers Pick a time: https://calendly.com/{domain.split('.')[0]}/30min "
+                    + _filler(rng, body_chars))
+            sender = f"Recruiter <talent@{domain}>"
+        else:
+            subject = rng.choice(NOISE)
+            body = f"{_filler(rng, body_chars)} unsubscribe https://news.example.com/unsubscribe"
+            sender = "News <news@example.com>"
+        messages = []
+        for j in range(rng.randint(1, 3)):
+            messages.append({"id": f"{tid}-m{j}", "from": sender if j % 2 == 0 else "Me <me@gmail.com>",
+                             "subject": subject, "body": body if j == 0 else f"Sounds good. {_filler(rng, 80)}",
+                             "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sent + j * 3600))})
+        inbox[tid] = {"thread_id": tid, "subject": subject, "messages": messages,
+                      "historyId": str(rng.randint(10_000, 99_999))}
+    return inbox
+
+
+def build_server(args: argparse.Namespace) -> FastMCP:
+    rng = random.Random(args.seed + 1)
+    mcp = FastMCP(f"fake-{args.role}", log_level="WARNING")
+
+    async def delay() -> None:
+        ms = args.latency_ms * rng.uniform(1 - args.jitter, 1 + args.jitter)
+        await asyncio.sleep(max(0.0, ms) / 1000)
+
+    if args.role == "gmail":
+        inbox = make_inbox(args.inbox, args.seed, args.interview_ratio, args.body_chars)
+        ids = list(inbox)
+
+        @mcp.tool()
+        async def search_emails(query: str, maxResults: int = PAGE_SIZE, pageToken: str = "") -> str:
+            """Search Gmail threads with Gmail query syntax. Returns {threads, nextPageToken}."""
+            await delay()
+            start = int(pageToken or 0)
+            end = start + max(1, min(maxResults, PAGE_SIZE))
+            hits = [{"id": t, "threadId": t, "snippet": inbox[t]["subject"], "historyId": inbox[t]["historyId"]}
+                    for t in ids[start:end]]
+            return json.dumps({"threads": hits, "nextPageToken": str(end) if end < len(ids) else None})
+
+        @mcp.tool()
+        async def get_thread(thread_id: str) -> str:
+            """Get all messages in a Gmail thread."""
+            await delay()
+            return json.dumps(inbox.get(thread_id) or {"thread_id": thread_id, "messages": []})
+
+    else:
+        @mcp.tool()
+        async def firecrawl_scrape(url: str) -> str:
+            """Scrape a web page and return its content as markdown."""
+            await delay()
+            page_rng = random.Random(int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16))
+            return f"# {url}\n\n{_filler(page_rng, args.page_chars)}"
+
+        @mcp.tool()
+        async def firecrawl_search(query: str, limit: int = 5) -> str:
+            """Search the web and return result URLs with descriptions."""
+            await delay()
+            slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+            return json.dumps({"data": [{"url": f"https://news.example.com/{slug}/{i}", "title": f"{query} ({i})",
+                                         "description": f"Result {i} for {query}"} for i in range(limit)]})
+
+    return mcp
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--role", choices=("gmail", "web"), default="gmail")
+    ap.add_argument("--inbox", type=int, default=200, help="threads in the synthetic inbox")
+    ap.add_argument("--interview-ratio", type=float, default=0.3)
+    ap.add_argument("--body-chars", type=int, default=1500)
+    ap.add_argument("--page-chars", type=int, default=6000, help="scraped page size")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="mean per-call latency")
+    ap.add_argument("--jitter", type=float, default=0.5, help="latency spread, as a fraction of the mean")
+    ap.add_argument("--seed", type=int, default=7)
+    build_server(ap.parse_args()).run()
+
+
+if __name__ == "__main__":
+    main()
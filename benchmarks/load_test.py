@@ -0,0 +1,191 @@
+# benchmarks/load_test.py
+"""
+Offline load test: the real Flask app, served over HTTP on localhost, with
+stub MCP servers (benchmarks/fake_mcp_server.py, spawned over stdio exactly
+like npx would be) and the scripted fake model (benchmarks/fake_llm.py).
+No Gmail, Firecrawl or Gemini account involved.
+
+Scenarios, each driven by --concurrency client threads for --requests calls:
+  detect  GET  /api/interviews/today?full=1   (full scan of the synthetic inbox)
+  prep    GET  /api/prep/<thread_id>          (distinct interview threads)
+  build   POST /api/prep/build                (distinct company/role pairs)
+
+Prep and research caches are off unless --cached, so every call does the
+work. Reports requests/sec and p50/p95/p99 latency per scenario; with
+--max-p95 scenario=ms (repeatable) it exits 1 when a scenario is slower,
+which makes it usable as a regression gate.
+
+Run from the repo root:
+    python -m benchmarks.load_test [--inbox 300] [--concurrency 8] [--requests 40]
+        [--mcp-latency-ms 20] [--web-latency-ms 120] [--llm-ms 60] [--tool-steps 2]
+        [--malformed-rate 0.2] [--broken-rate 0.05] [--sparse-rate 0.1] [--scenarios detect,prep,build]
+        [--max-p95 prep=4000] [--json]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mcp_server.py")
+
+
+def _configure(args: argparse.Namespace, workdir: str) -> None:
+    """Environment for the app; must run before it is imported."""
+    common = ["--seed", str(args.seed), "--jitter", "0.5"]
+    servers = {
+        "gmail": {"transport": "stdio", "command": sys.executable,
+                  "args": [SERVER, "--role", "gmail", "--inbox", str(args.inbox),
+                           "--latency-ms", str(args.mcp_latency_ms)] + common},
+        "firecrawl-mcp": {"transport": "stdio", "command": sys.executable,
+                          "args": [SERVER, "--role", "web", "--latency-ms", str(args.web_latency_ms)] + common},
+    }
+    path = os.path.join(workdir, "mcp_servers.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(servers, f)
+    os.environ.update(MCP_SERVERS_FILE=path, PREPHUB_CACHE_DIR=workdir, PREP_WARMUP="0", PREP_PRECOMPUTE="0",
+                      MCP_EAGER_START="1")
+    if not args.cached:
+        os.environ.update(PREP_CACHE_DISABLE="1", RESEARCH_CACHE_DISABLE="1")
+
+
+def _percentile(sorted_ms: List[float], p: float) -> float:
+    if not sorted_ms:
+        return float("nan")
+    return sorted_ms[max(0, math.ceil(p / 100 * len(sorted_ms)) - 1)]
+
+
+class _Client:
+    def __init__(self, base: str, timeout: float):
+        self.base = base
+        self.timeout = timeout
+
+    def call(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[bool, float, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                payload = json.loads(resp.read() or b"null")
+                ok = resp.status == 200 and not (isinstance(payload, dict) and payload.get("error"))
+        except Exception as e:
+            payload, ok = repr(e), False
+        return ok, (time.perf_counter() - t0) * 1000, payload
+
+
+def _run(client: _Client, concurrency: int, calls: List[Callable[[], Tuple[bool, float, Any]]]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda fn: fn(), calls))
+    wall = time.perf_counter() - t0
+    ms = sorted(r[1] for r in results)
+    errors = [r[2] for r in results if not r[0]]
+    return {
+        "requests": len(results), "errors": len(errors), "rps": round(len(results) / wall, 2),
+        "p50_ms": round(_percentile(ms, 50), 1), "p95_ms": round(_percentile(ms, 95), 1),
+        "p99_ms": round(_percentile(ms, 99), 1), "max_ms": round(ms[-1], 1) if ms else None,
+        "first_error": str(errors[0])[:200] if errors else None,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--inbox", type=int, default=300, help="threads in the synthetic inbox")
+    ap.add_argument("--mcp-latency-ms", type=float, default=20.0, help="Gmail stub latency per call")
+    ap.add_argument("--web-latency-ms", type=float, default=120.0, help="Firecrawl stub latency per call")
+    ap.add_argument("--llm-ms", type=float, default=60.0, help="fake model latency per turn")
+    ap.add_argument("--tool-steps", type=int, default=2, help="web tool calls per agent run")
+    ap.add_argument("--malformed-rate", type=float, default=0.2)
+    ap.add_argument("--broken-rate", type=float, default=0.05)
+    ap.add_argument("--sparse-rate", type=float, default=0.1, help="fast-model drafts that need escalation")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=40, help="per scenario")
+    ap.add_argument("--scenarios", default="detect,prep,build")
+    ap.add_argument("--cached", action="store_true", help="leave the prep/research caches on")
+    ap.add_argument("--timeout", type=float, default=120.0, help="per request, seconds")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--max-p95", action="append", default=[], metavar="SCENARIO=MS")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="prephub-load-")
+    _configure(args, workdir)
+    warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+    from werkzeug.serving import make_server
+    import llm_pool
+    from app import app
+    from benchmarks.fake_llm import ScriptedChatModel
+    from utils.async_runtime import run_async
+
+    llm_pool.set_model_factory(lambda model, provider: ScriptedChatModel(
+        model=model, latency_ms=args.llm_ms, tool_steps=args.tool_steps,
+        malformed_rate=args.malformed_rate, broken_rate=args.broken_rate,
+        sparse_rate=0.0 if model == llm_pool.PRO_MODEL else args.sparse_rate))
+    run_async(llm_pool.warm_up())  # also waits for the stub servers to come up
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no access log per request
+    httpd = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    client = _Client(f"http://127.0.0.1:{httpd.server_port}", args.timeout)
+
+    ok, ms, detected = client.call("GET", "/api/interviews/today?full=1")
+    thread_ids = [it["thread_id"] for it in (detected or {}).get("interviews", [])] if ok else []
+    print(f"inbox={args.inbox} interviews={len(thread_ids)} concurrency={args.concurrency} "
+          f"requests={args.requests} llm={args.llm_ms}ms gmail={args.mcp_latency_ms}ms web={args.web_latency_ms}ms "
+          f"(warm-up detect {ms:.0f} ms)", file=sys.stderr)
+
+    n = args.requests
+    scenarios: Dict[str, List[Callable[[], Tuple[bool, float, Any]]]] = {
+        "detect": [lambda: client.call("GET", "/api/interviews/today?full=1") for _ in range(n)],
+        "prep": [lambda t=thread_ids[i % len(thread_ids)]: client.call("GET", f"/api/prep/{t}")
+                 for i in range(n)] if thread_ids else [],
+        "build": [lambda i=i: client.call("POST", "/api/prep/build",
+                                          {"company": f"Loadtest Co {i}", "role": "Backend Engineer"})
+                  for i in range(n)],
+    }
+    report: Dict[str, Any] = {}
+    for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        if not scenarios.get(name):
+            print(f"skipping {name!r}: nothing to run", file=sys.stderr)
+            continue
+        report[name] = _run(client, args.concurrency, scenarios[name])
+
+    with urllib.request.urlopen(client.base + "/api/prep/stats", timeout=10) as resp:
+        report["json_parse"] = json.loads(resp.read()).get("json_parse")
+    httpd.shutdown()
+
+    failed = []
+    for budget in args.max_p95:
+        name, _, limit = budget.partition("=")
+        if name in report and report[name]["p95_ms"] > float(limit):
+            failed.append(f"{name} p95 {report[name]['p95_ms']} ms > {limit} ms")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'scenario':<8} {'reqs':>5} {'errs':>5} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, r in report.items():
+            if name == "json_parse":
+                continue
+            print(f"{name:<8} {r['requests']:>5} {r['errors']:>5} {r['rps']:>7} {r['p50_ms']:>8} "
+                  f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+            if r["first_error"]:
+                print(f"         first error: {r['first_error']}")
+        print("json parse:", report["json_parse"])
+    for f in failed:
+        print("REGRESSION:", f, file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
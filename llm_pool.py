@@ -0,0 +1,140 @@
+# llm_pool.py
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from langchain.chat_models import init_chat_model
+from langgraph.prebuilt import create_react_agent
+from mcp_client import get_mcp_tools_cached, live_tool_versions, tools_version
+from utils.metrics import COMPLETION_TOKENS, LLM_SECONDS, PROMPT_TOKENS, MetricsCallback, instrument
+
+# Process-wide pool of chat model clients and compiled ReAct graphs.
+# Building a client (and its HTTP/gRPC channel) and compiling a graph used to
+# happen on every request; both are now built once and reused. Graphs are keyed
+# by the MCP tool-set version, so reloading the tools transparently recompiles.
+
+PRO_MODEL = os.environ.get("PREP_MODEL", "gemini-2.5-pro")
+FAST_MODEL = os.environ.get("PREP_FAST_MODEL", "gemini-2.5-flash")
+FIXER_MODEL = os.environ.get("PREP_FIXER_MODEL", "gemini-2.0-flash")
+PROVIDER = "google_genai"
+
+# Model routing for prep generation (PREP_MODEL_POLICY):
+#   pro        every turn on PRO_MODEL (the old behaviour)
+#   tiered     ReAct tool/extraction turns on FAST_MODEL; the result is checked
+#              and only escalated to PRO_MODEL for a final synthesis turn when at
+#              least PREP_ESCALATE_MIN_EMPTY required sections came back empty
+#   synthesis  FAST_MODEL for the tool turns, PRO_MODEL always writes the brief
+POLICIES = ("pro", "tiered", "synthesis")
+POLICY = os.environ.get("PREP_MODEL_POLICY", "tiered")
+ESCALATE_MIN_EMPTY = int(os.environ.get("PREP_ESCALATE_MIN_EMPTY", 1))
+
+ModelFactory = Callable[[str, str], Any]
+
+
+def _default_factory(model: str, provider: str) -> Any:
+    return init_chat_model(model, model_provider=provider, api_key=os.environ.get("GOOGLE_API_KEY"))
+
+
+_model_factory: ModelFactory = _default_factory
+_models: Dict[Tuple[str, str], Any] = {}
+_graphs: Dict[Tuple[Any, ...], Any] = {}
+_stats = {"model_builds": 0, "model_hits": 0, "graph_builds": 0, "graph_hits": 0, "warmup_ms": None}
+_route_stats = {"runs": 0, "escalated": 0, "kept": 0}
+
+
+def set_model_factory(factory: Optional[ModelFactory]) -> None:
+    """Swap how models are built (benchmarks / fake models). Clears the pool."""
+    global _model_factory
+    _model_factory = factory or _default_factory
+    _models.clear()
+    _graphs.clear()
+
+
+def get_chat_model(model: str = PRO_MODEL, provider: str = PROVIDER) -> Any:
+    key = (model, provider)
+    llm = _models.get(key)
+    if llm is None:
+        # per-model handler: latency and token histograms labelled with the model name
+        llm = _models[key] = instrument(_model_factory(model, provider), MetricsCallback(model))
+        _stats["model_builds"] += 1
+    else:
+        _stats["model_hits"] += 1
+    return llm
+
+
+async def get_react_agent(model: str = PRO_MODEL, provider: str = PROVIDER,
+                          tools: Optional[Sequence[Any]] = None) -> Any:
+    """
+    Compiled ReAct graph for (model, tool set). With tools=None the full MCP tool
+    set is used; pass a subset for focused sub-agents.
+    """
+    all_tools = await get_mcp_tools_cached()
+    tools = all_tools if tools is None else list(tools)
+    key = (model, provider, tools_version(), tuple(getattr(t, "name", repr(t)) for t in tools))
+    graph = _graphs.get(key)
+    if graph is None:
+        # drop graphs compiled against tool sets that were reloaded or left the pool
+        live = live_tool_versions() | {key[2]}
+        for stale in [k for k in _graphs if k[2] not in live]:
+            del _graphs[stale]
+        graph = _graphs[key] = create_react_agent(get_chat_model(model, provider), tools)
+        _stats["graph_builds"] += 1
+    else:
+        _stats["graph_hits"] += 1
+    return graph
+
+
+# ---------- Routing ----------
+
+def _policy() -> str:
+    return POLICY if POLICY in POLICIES else "tiered"
+
+
+def agent_model() -> str:
+    """Model for the ReAct loop (tool selection, reading pages, drafting)."""
+    return PRO_MODEL if _policy() == "pro" else FAST_MODEL
+
+
+def should_escalate(empty_sections: int) -> bool:
+    """Whether the drafted brief goes to PRO_MODEL for a final synthesis turn."""
+    policy = _policy()
+    if policy == "pro" or agent_model() == PRO_MODEL:
+        escalate = False
+    elif policy == "synthesis":
+        escalate = True
+    else:
+        escalate = empty_sections >= max(1, ESCALATE_MIN_EMPTY)
+    _route_stats["runs"] += 1
+    _route_stats["escalated" if escalate else "kept"] += 1
+    return escalate
+
+
+def route_stats() -> Dict[str, Any]:
+    """Policy, escalation rate and per-model calls / latency / tokens (from the metrics callbacks)."""
+    calls = LLM_SECONDS.totals("model")
+    prompt = PROMPT_TOKENS.totals("model")
+    completion = COMPLETION_TOKENS.totals("model")
+    models = {
+        m: {"calls": int(n), "avg_ms": round(total / n * 1000, 1) if n else None,
+            "prompt_tokens": int(prompt.get(m, (0, 0))[1]), "completion_tokens": int(completion.get(m, (0, 0))[1])}
+        for m, (n, total) in calls.items()
+    }
+    runs = _route_stats["runs"]
+    return {"policy": _policy(), "agent_model": agent_model(), "pro_model": PRO_MODEL,
+            "escalate_min_empty": ESCALATE_MIN_EMPTY, **_route_stats,
+            "escalation_rate": round(_route_stats["escalated"] / runs, 3) if runs else None, "models": models}
+
+
+async def warm_up() -> None:
+    """Build the common clients and the default graph before the first request."""
+    t0 = time.perf_counter()
+    get_chat_model(PRO_MODEL)
+    get_chat_model(FIXER_MODEL)
+    try:
+        await get_react_agent(agent_model())
+    except Exception as e:  # MCP servers unavailable: the first request will retry
+        print("[llm_pool] warm-up could not build the agent graph:", repr(e))
+    _stats["warmup_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+
+def pool_stats() -> Dict[str, Any]:
+    return {**_stats, "models": len(_models), "graphs": len(_graphs)}
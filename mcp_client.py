@@ -1,16 +1,43 @@
 # mcp_client.py
 import os
+import re
+import hmac
+import json
+import time
+import uuid
+import hashlib
+import asyncio
+import contextlib
+import contextvars
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from utils.async_runtime import spawn
+from utils.metrics import histogram, instrument
+from utils.web_cache import cached_tool
 
-def get_mcp_client():
-    return MultiServerMCPClient({
-        "gmail": {
-            "transport": "stdio",
-            "command": "npx",
-            "args": [
-                "@gongrzhe/server-gmail-autoauth-mcp"
-            ]
-        },
+
+def _servers(home: Optional[str] = None) -> dict:
+    override = os.environ.get("MCP_SERVERS_FILE")
+    if override:
+        # alternate server set, same shape as below (e.g. the stub servers in
+        # benchmarks/load_test.py); names must keep "gmail" / "firecrawl" in them
+        with open(override, "r", encoding="utf-8") as f:
+            return json.load(f)
+    gmail: Dict[str, Any] = {
+        "transport": "stdio",
+        "command": "npx",
+        "args": [
+            "@gongrzhe/server-gmail-autoauth-mcp"
+        ]
+    }
+    if home:
+        # a pooled user's credential home: the gmail server keeps its OAuth files
+        # under ~/.gmail-mcp; npx keeps the shared package cache
+        gmail["env"] = {"HOME": home, "npm_config_cache": os.path.join(os.path.expanduser("~"), ".npm")}
+    return {
+        "gmail": gmail,
         "firecrawl-mcp": {
             "transport": "stdio",
             "command": "npx",
@@ -19,48 +46,587 @@ def get_mcp_client():
                 "FIRECRAWL_API_KEY": os.environ.get("FIRECRAWL_API_KEY", ""),
             }
         },
-    })
+    }
 
 
-def get_mcp_client() -> MultiServerMCPClient:
+def get_mcp_client(home: Optional[str] = None) -> MultiServerMCPClient:
     """Create a fresh client (usually you won't need this directly)."""
-    return MultiServerMCPClient(_servers())
+    return MultiServerMCPClient(_servers(home))
+
+# ---------- Tenants ----------
+# Each request runs on behalf of one Gmail credential home. The default user
+# (MCP_GMAIL_HOME, blank for single-user) uses the servers' own HOME; other
+# users get a home under MCP_TENANT_ROOT, picked per request by set_tenant().
+# The choice rides along in a context variable, so it follows run_async(),
+# spawned tasks and jobs (which copy the submitter's context).
+#
+# A tenant is only ever taken from a token signed with MCP_TENANT_SECRET
+# (whatever authenticates the user issues it, see sign_tenant()), never from
+# a bare user name: whoever can name a home can read that mailbox. The token
+# is "<user>:<expires unix ts>:<hex HMAC-SHA256 of user:expires>". With
+# MCP_TENANT_ROOT set but no secret, pooled tenants are refused outright.
+# MCP_TENANT_USERS (comma-separated) optionally narrows the users allowed.
+# Requests without a token use the default user, so MCP_TENANT_ROOT belongs
+# behind something that keeps anonymous callers out.
+
+_tenant: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("mcp_tenant_home", default=None)
+_TENANT_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.@-]{0,127}")
+
+
+def _tenant_sig(secret: str, user: str, expires: int) -> str:
+    return hmac.new(secret.encode("utf-8"), f"{user}:{expires}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def sign_tenant(user: str, ttl: float = 3600.0) -> str:
+    """Tenant token for `user`, valid for `ttl` seconds (for the service that authenticates users)."""
+    secret = os.environ.get("MCP_TENANT_SECRET")
+    if not secret:
+        raise RuntimeError("MCP_TENANT_SECRET is not set")
+    expires = int(time.time() + ttl)
+    return f"{user}:{expires}:{_tenant_sig(secret, user, expires)}"
+
+
+def verify_tenant(token: Optional[str]) -> Optional[str]:
+    """The user a tenant token was signed for, or None if it is malformed, expired, forged or not allowed."""
+    secret = os.environ.get("MCP_TENANT_SECRET")
+    if not secret or not token or token.count(":") != 2:
+        return None
+    user, expires, sig = token.split(":")
+    if not _TENANT_RE.fullmatch(user) or not expires.isdigit() or int(expires) < time.time():
+        return None
+    if not hmac.compare_digest(sig, _tenant_sig(secret, user, int(expires))):
+        return None
+    allowed = os.environ.get("MCP_TENANT_USERS")
+    if allowed and user not in {u.strip() for u in allowed.split(",")}:
+        return None
+    return user
+
+
+def tenant_home(user: Optional[str]) -> Optional[str]:
+    """Credential home for a verified `user` under MCP_TENANT_ROOT, or None (default user / pooling off)."""
+    root = os.environ.get("MCP_TENANT_ROOT")
+    if not root or not user or not _TENANT_RE.fullmatch(user):
+        return None
+    return os.path.join(root, user)
+
+
+def set_tenant(home: Optional[str]) -> contextvars.Token:
+    return _tenant.set(home)
+
+
+def current_tenant() -> str:
+    home = _tenant.get()
+    return home if home is not None else os.environ.get("MCP_GMAIL_HOME", "")
 
-# ---------- Simple async cache for tools ----------
-_tools_cache: Optional[list] = None
-_tools_lock = asyncio.Lock()
-_cache_key: Optional[str] = None  # lets us invalidate if HOME or config changes
 
 def _current_key() -> str:
-    # If you later key by user/org, include that here.
-    return f"{os.environ.get('MCP_GMAIL_HOME','')}"  # blank for single-user
+    return current_tenant()  # blank for single-user
+
+# ---------- Persistent server sessions ----------
+# client.get_tools() returns tools that open a brand-new stdio session (i.e. a new
+# `npx` process) on every single call. Instead we keep one session per server open
+# and bind the tools to it. Each session is owned by its own task so that the
+# anyio scopes inside stdio_client are entered and exited by the same task.
+
+_MARKER_ENV = "PREPHUB_MCP_SESSION"  # tags a session's subprocesses for the footprint report
+
+
+class _ServerSession:
+    def __init__(self, name: str, connection: Dict[str, Any], state: Dict[str, Any]):
+        self.name = name
+        self.marker = uuid.uuid4().hex
+        env = {**(connection.get("env") or {}), _MARKER_ENV: self.marker}
+        self.client = MultiServerMCPClient({name: {**connection, "env": env}})
+        self.state = state
+        self.session = None
+        self.tools: list = []
+        self.startup_ms: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    async def start(self) -> list:
+        t0 = time.perf_counter()
+        self._task = asyncio.create_task(self._run(), name=f"mcp:{self.name}")
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        self.startup_ms = round((time.perf_counter() - t0) * 1000, 1)
+        self.started_at = time.time()
+        return self.tools
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        try:
+            async with self.client.session(self.name) as session:
+                self.session = session
+                self.tools = [instrument(t) for t in await load_mcp_tools(session, server_name=self.name)]
+                self._ready.set()
+                await self._stop.wait()
+        except BaseException as e:  # surfaced to start() if we never got ready
+            self._error = e
+        finally:
+            crashed = self._ready.is_set() and not self._stop.is_set()
+            self.session = None
+            self._ready.set()
+            if crashed:  # server went away under us: let the supervisor respawn it now
+                self.state["last_error"] = repr(self._error) if self._error else "session ended"
+                _wake_supervisor()
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except BaseException:
+                pass
+
+
+async def _open_sessions(ts: "_ToolSet") -> List[_ServerSession]:
+    """Start every configured server; keep the ones that came up (the supervisor retries the rest)."""
+    sessions = [_ServerSession(name, conn, ts.state_for(name)) for name, conn in _servers(ts.home).items()]
+    results = await asyncio.gather(*(s.start() for s in sessions), return_exceptions=True)
+    ok: List[_ServerSession] = []
+    for s, r in zip(sessions, results):
+        s.state["starts"] += 1
+        if isinstance(r, BaseException):
+            _record_failure(ts, s.name, r)
+        else:
+            s.state.update(startup_ms=s.startup_ms, consecutive_failures=0, last_error=None)
+            ok.append(s)
+    if not ok:
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+    return ok
+
+
+async def _close_sessions(sessions: List[_ServerSession]) -> None:
+    await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+# ---------- Capability registry ----------
+# Callers ask for a capability ("gmail.search") instead of scanning tool names
+# themselves. Resolution happens once per tool-cache load. Rules are tried in
+# order; a rule matches when all its terms appear in the tool name (or, as a
+# second pass, in name + description). Ties go to the shortest tool name, so
+# firecrawl_scrape wins over firecrawl_batch_scrape.
+
+_CAPABILITY_RULES: Dict[str, Tuple[str, List[Tuple[str, ...]]]] = {
+    "gmail.search": ("gmail", [("search",)]),
+    "gmail.get_thread": ("gmail", [("get_thread",), ("thread", "get"), ("thread", "read"), ("messages in thread",)]),
+    "web.scrape": ("firecrawl", [("scrape",)]),
+    "web.search": ("firecrawl", [("search",)]),
+}
+
+WEB_CAPABILITIES = ("web.scrape", "web.search")  # served through utils.web_cache
+
+def _build_registry(entries: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+    """entries: (server_name or "", tool) pairs."""
+    described = []
+    for server, t in entries:
+        name = (getattr(t, "name", "") or "").lower()
+        blob = name + " " + (getattr(t, "description", "") or "").lower()
+        described.append((server.lower(), name, blob, t))
+
+    registry: Dict[str, Any] = {}
+    for cap, (server_hint, rules) in _CAPABILITY_RULES.items():
+        pool = [d for d in described if server_hint in (d[0] or d[2])]
+        for field in (1, 2):  # name first, then name + description
+            for terms in rules:
+                matches = [d for d in pool if all(term in d[field] for term in terms)]
+                if matches:
+                    registry[cap] = min(matches, key=lambda d: len(d[1]))[3]
+                    break
+            if cap in registry:
+                break
+    return registry
+
+def _cache_web_tools(registry: Dict[str, Any], tools: list) -> list:
+    """Swap the web tools for caching copies, in the registry and in the flat tool list."""
+    swapped: Dict[int, Any] = {}
+    for cap in WEB_CAPABILITIES:
+        t = registry.get(cap)
+        if t is not None:
+            swapped[id(t)] = registry[cap] = swapped.get(id(t)) or cached_tool(t, cap)
+    return [swapped.get(id(t), t) for t in tools]
+
+# ---------- Session pool (one tool set per credential home) ----------
+# Everything below lives on the shared loop (utils.async_runtime); routes must
+# not call these through asyncio.run(). Each credential home gets its own
+# server sessions, tool list and capability registry, guarded by its own lock,
+# so one user's cold start never blocks another user's warm request. The pool
+# holds at most MCP_POOL_MAX homes (least recently used goes first) and shuts
+# down homes idle for MCP_POOL_IDLE_SECONDS. The default home is never evicted,
+# and neither is a home with runs in flight (tools_in_use()), so the pool can
+# sit above its cap until they finish.
+
+POOL_MAX = int(os.environ.get("MCP_POOL_MAX", 8))
+POOL_IDLE_SECONDS = float(os.environ.get("MCP_POOL_IDLE_SECONDS", 30 * 60))
+
+
+class _ToolSet:
+    def __init__(self, key: str, home: Optional[str]):
+        self.key = key
+        self.home = home  # None: default user, servers keep their own HOME
+        self.sessions: List[_ServerSession] = []
+        self.tools: Optional[list] = None
+        self.registry: Dict[str, Any] = {}
+        self.version = 0
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.in_use = 0  # runs holding this set (tools_in_use); never retired while > 0
+        self.cold_start_ms: Optional[float] = None
+        self.loads = 0
+        self.state: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def pinned(self) -> bool:
+        return self.home is None
+
+    def state_for(self, name: str) -> Dict[str, Any]:
+        st = self.state.get(name)
+        if st is None:
+            st = self.state[name] = {
+                "starts": 0, "respawns": 0, "startup_ms": None, "last_respawn_ms": None,
+                "probes": 0, "probe_failures": 0, "last_probe_ms": None, "last_probe_at": None,
+                "consecutive_failures": 0, "retry_at": 0.0, "last_error": None,
+            }
+        return st
+
+
+_pool: "OrderedDict[str, _ToolSet]" = OrderedDict()
+_tools_version = 0  # global counter; every (re)load of any tool set takes the next value
+_pool_stats = {"evictions": 0, "idle_shutdowns": 0}
+
+
+def _tool_set_for_current() -> _ToolSet:
+    key = _current_key()
+    ts = _pool.get(key)
+    if ts is None:
+        ts = _pool[key] = _ToolSet(key, _tenant.get())
+    _pool.move_to_end(key)
+    ts.last_used = time.monotonic()
+    return ts
+
+
+def _bump(ts: _ToolSet) -> None:
+    global _tools_version
+    _tools_version += 1
+    ts.version = _tools_version
+
+
+def _install(ts: _ToolSet, sessions: List[_ServerSession]) -> None:
+    """Publish a session set: flat tool list, capability registry, new version."""
+    tools: list = []
+    for s in sessions:
+        tools.extend(s.tools)
+    ts.registry = _build_registry((s.name, t) for s in sessions for t in s.tools)
+    ts.sessions, ts.tools = sessions, _cache_web_tools(ts.registry, tools)
+    _bump(ts)
+
+
+def _retire(ts: _ToolSet) -> None:
+    """Drop a tool set from the pool and shut its servers down in the background."""
+    if _pool.get(ts.key) is ts:
+        del _pool[ts.key]
+    old, ts.sessions, ts.tools, ts.registry = ts.sessions, [], None, {}
+    if old:
+        spawn(_close_sessions(old))
+
+
+def _evict_lru() -> None:
+    while len(_pool) > POOL_MAX:
+        victim = next((ts for ts in _pool.values()
+                       if not ts.pinned and not ts.in_use and not ts.lock.locked()), None)
+        if victim is None:
+            return
+        _pool_stats["evictions"] += 1
+        _retire(victim)
+
+
+async def _load(ts: _ToolSet) -> None:
+    if ts.sessions:
+        await _close_sessions(ts.sessions)
+        ts.sessions = []
+    t0 = time.perf_counter()
+    _install(ts, await _open_sessions(ts))
+    ms = round((time.perf_counter() - t0) * 1000, 1)
+    if ts.cold_start_ms is None:
+        ts.cold_start_ms = ms
+    ts.loads += 1
+
+
+_TOOLS_SECONDS = histogram("prephub_mcp_tools_seconds",
+                           "get_mcp_tools_cached calls that had to wait for servers (cold start / reload).")
+
 
 async def get_mcp_tools_cached() -> list:
     """
-    Initialize MCP servers once and reuse the bound tools.
-    Safe to call from multiple coroutines — guarded by an asyncio.Lock.
+    Initialize MCP servers once per credential home and reuse the bound tools.
+    Safe to call from multiple coroutines — guarded by a per-home asyncio.Lock.
     """
-    global _tools_cache, _cache_key
+    ts = _tool_set_for_current()
     if os.environ.get("MCP_CACHE_DISABLE") == "1":
         # escape hatch for debugging
-        client = get_mcp_client()
-        return await client.get_tools()
+        tools = [instrument(t) for t in await get_mcp_client(ts.home).get_tools()]
+        ts.registry = _build_registry(("", t) for t in tools)
+        tools = _cache_web_tools(ts.registry, tools)
+        _bump(ts)
+        return tools
 
-    key = _current_key()
-    if _tools_cache is not None and _cache_key == key:
-        return _tools_cache
-
-    async with _tools_lock:
+    if ts.tools is not None:
+        return ts.tools
+    t0 = time.perf_counter()
+    async with ts.lock:
         # re-check inside the lock
-        if _tools_cache is not None and _cache_key == key:
-            return _tools_cache
-        client = get_mcp_client()
-        _tools_cache = await client.get_tools()
-        _cache_key = key
-        return _tools_cache
+        if ts.tools is None:
+            await _load(ts)
+    _TOOLS_SECONDS.observe(time.perf_counter() - t0, result="load")
+    _evict_lru()
+    _ensure_supervisor()
+    return ts.tools
+
+@contextlib.asynccontextmanager
+async def tools_in_use() -> AsyncIterator[list]:
+    """
+    The current home's tools, held for the length of a run: while any run
+    holds a tool set it is neither evicted nor shut down as idle. Wrap each
+    agent run (or anything else that keeps calling tools) in one of these.
+    """
+    ts = _tool_set_for_current()
+    ts.in_use += 1  # before loading, so the eviction after a cold start can't pick this set
+    try:
+        yield await get_mcp_tools_cached()
+    finally:
+        ts.in_use -= 1
+        ts.last_used = time.monotonic()
+        _evict_lru()  # the pool may have gone over its cap while this set was held
 
 def reset_mcp_tools_cache() -> None:
-    """Call this if you change MCP_GMAIL_HOME or want to force a reload."""
-    global _tools_cache, _cache_key
-    _tools_cache = None
-    _cache_key = None
\ No newline at end of file
+    """Call this if you change MCP_GMAIL_HOME or want to force a reload (all homes)."""
+    for ts in list(_pool.values()):
+        _retire(ts)
+
+def tools_version() -> int:
+    """Version of the current home's tool set; distinct across homes and reloads."""
+    ts = _pool.get(_current_key())
+    return ts.version if ts is not None and ts.version else _tools_version
+
+def live_tool_versions() -> Set[int]:
+    return {ts.version for ts in _pool.values() if ts.tools is not None}
+
+async def get_tool(capability: str) -> Optional[Any]:
+    """Resolved tool for a capability (gmail.search, gmail.get_thread, web.scrape, web.search), or None."""
+    await get_mcp_tools_cached()
+    return _tool_set_for_current().registry.get(capability)
+
+async def get_tools_for(*capabilities: str) -> Tuple[Optional[Any], ...]:
+    await get_mcp_tools_cached()
+    registry = _tool_set_for_current().registry
+    return tuple(registry.get(c) for c in capabilities)
+
+# ---------- Eager startup, health probes, supervised respawn ----------
+# The servers are started with the app instead of on the first request. A
+# supervisor task pings every live session each MCP_PROBE_INTERVAL seconds
+# (and immediately when a session's stdio pipe closes); a server that is
+# gone or doesn't answer within MCP_PROBE_TIMEOUT is respawned on its own,
+# with exponential backoff between failed attempts. Each respawn publishes
+# a new tool set (and tools_version) so compiled agent graphs rebind.
+
+PROBE_INTERVAL = float(os.environ.get("MCP_PROBE_INTERVAL", 30))
+PROBE_TIMEOUT = float(os.environ.get("MCP_PROBE_TIMEOUT", 5))
+RESPAWN_BACKOFF = float(os.environ.get("MCP_RESPAWN_BACKOFF", 1))
+RESPAWN_BACKOFF_MAX = float(os.environ.get("MCP_RESPAWN_BACKOFF_MAX", 60))
+
+_supervisor: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+
+
+def _record_failure(ts: _ToolSet, name: str, exc: BaseException) -> None:
+    st = ts.state_for(name)
+    st["consecutive_failures"] += 1
+    st["last_error"] = repr(exc)
+    backoff = min(RESPAWN_BACKOFF_MAX, RESPAWN_BACKOFF * 2 ** (st["consecutive_failures"] - 1))
+    st["retry_at"] = time.monotonic() + backoff
+    print(f"[mcp] server {name!r} failed to start (retry in {backoff:.1f}s):", repr(exc))
+
+
+def _wake_supervisor() -> None:
+    if _wake is not None:
+        _wake.set()
+
+
+async def _probe(s: _ServerSession) -> bool:
+    st = s.state
+    if not s.alive:
+        return False
+    st["probes"] += 1
+    t0 = time.perf_counter()
+    try:
+        await asyncio.wait_for(s.session.send_ping(), PROBE_TIMEOUT)
+        return True
+    except Exception as e:
+        st["probe_failures"] += 1
+        st["last_error"] = f"probe: {e!r}"
+        return False
+    finally:
+        st["last_probe_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        st["last_probe_at"] = time.time()
+
+
+async def _respawn(ts: _ToolSet, name: str) -> None:
+    st = ts.state_for(name)
+    if time.monotonic() < st["retry_at"]:
+        return  # still backing off
+    async with ts.lock:
+        if ts.tools is None:
+            return  # retired or reset meanwhile; the next get_mcp_tools_cached() starts from scratch
+        stale = [s for s in ts.sessions if s.name == name]
+        await _close_sessions(stale)
+        keep = [s for s in ts.sessions if s.name != name]
+        fresh = _ServerSession(name, _servers(ts.home)[name], st)
+        st["starts"] += 1
+        try:
+            await fresh.start()
+        except Exception as e:
+            _record_failure(ts, name, e)
+            if stale:
+                _install(ts, keep)  # drop the dead server's tools rather than keep failing calls
+            return
+        st["respawns"] += 1
+        st.update(startup_ms=fresh.startup_ms, last_respawn_ms=fresh.startup_ms,
+                  consecutive_failures=0, retry_at=0.0)
+        _install(ts, keep + [fresh])
+        print(f"[mcp] server {name!r} respawned in {fresh.startup_ms}ms")
+
+
+async def _check_servers() -> None:
+    if os.environ.get("MCP_CACHE_DISABLE") == "1":
+        return
+    now = time.monotonic()
+    for ts in list(_pool.values()):
+        if ts.tools is None or ts.lock.locked():
+            continue  # not loaded yet, or (re)loading right now
+        if not ts.pinned and not ts.in_use and POOL_IDLE_SECONDS > 0 and now - ts.last_used > POOL_IDLE_SECONDS:
+            _pool_stats["idle_shutdowns"] += 1
+            _retire(ts)
+            continue
+        live = {s.name: s for s in ts.sessions}
+        for name in _servers(ts.home):
+            s = live.get(name)
+            if s is None or not await _probe(s):
+                await _respawn(ts, name)
+
+
+def _next_wait() -> float:
+    now = time.monotonic()
+    pending = [st["retry_at"] - now for ts in _pool.values() if ts.tools is not None
+               for st in ts.state.values() if st["consecutive_failures"]]
+    return max(0.0, min([PROBE_INTERVAL] + pending))
+
+
+async def _supervise() -> None:
+    global _wake
+    _wake = asyncio.Event()
+    while True:
+        try:
+            await asyncio.wait_for(_wake.wait(), _next_wait())
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+        try:
+            await _check_servers()
+        except Exception as e:
+            print("[mcp] supervisor check failed:", repr(e))
+
+
+def _ensure_supervisor() -> None:
+    global _supervisor
+    if os.environ.get("MCP_SUPERVISE", "1") != "1":
+        return
+    if _supervisor is None or _supervisor.done():
+        _supervisor = asyncio.ensure_future(_supervise())
+
+
+async def start_mcp() -> None:
+    """Start the default user's MCP servers and the supervisor now (app startup) instead of on first use."""
+    try:
+        await get_mcp_tools_cached()
+    except Exception as e:
+        print("[mcp] eager start failed; the first request will retry:", repr(e))
+    _ensure_supervisor()
+
+# ---------- Footprint report ----------
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _process_footprints() -> Dict[str, Tuple[int, int]]:
+    """marker -> (rss_bytes, process_count) for every tagged MCP subprocess (Linux /proc only)."""
+    out: Dict[str, Tuple[int, int]] = {}
+    if not os.path.isdir("/proc"):
+        return out
+    needle = (_MARKER_ENV + "=").encode()
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/environ", "rb") as f:
+                env = f.read()
+            at = env.find(needle)
+            if at == -1:
+                continue
+            marker = env[at + len(needle):].split(b"\0", 1)[0].decode()
+            with open(f"/proc/{pid}/statm") as f:
+                rss = int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue  # exited meanwhile, or not ours to read
+        total, count = out.get(marker, (0, 0))
+        out[marker] = (total + rss, count + 1)
+    return out
+
+
+def mcp_stats() -> Dict[str, Any]:
+    now = time.monotonic()
+    footprints = _process_footprints()
+    tenants = {}
+    for ts in _pool.values():
+        live = {s.name: s for s in ts.sessions}
+        servers = {}
+        for name in _servers(ts.home):
+            st = {k: v for k, v in ts.state_for(name).items() if k != "retry_at"}
+            s = live.get(name)
+            alive = bool(s and s.alive)
+            rss, procs = footprints.get(s.marker, (0, 0)) if s else (0, 0)
+            st.update(
+                alive=alive,
+                uptime_s=round(time.time() - s.started_at, 1) if alive and s.started_at else None,
+                retry_in_s=round(max(0.0, ts.state_for(name)["retry_at"] - now), 1)
+                if st["consecutive_failures"] else None,
+                tools=len(s.tools) if s else 0,
+                rss_bytes=rss if s else None,
+                processes=procs if s else 0,
+            )
+            servers[name] = st
+        label = os.path.basename(ts.home.rstrip("/")) if ts.home else "default"
+        tenants[label] = {
+            "loaded": ts.tools is not None,
+            "cold_start_ms": ts.cold_start_ms,
+            "loads": ts.loads,
+            "in_use": ts.in_use,
+            "tools_version": ts.version,
+            "idle_s": round(now - ts.last_used, 1),
+            "rss_bytes": sum(v["rss_bytes"] or 0 for v in servers.values()),
+            "servers": servers,
+        }
+    return {
+        "pool": {"size": len(_pool), "max": POOL_MAX, "idle_timeout_s": POOL_IDLE_SECONDS, **_pool_stats},
+        "supervisor_running": _supervisor is not None and not _supervisor.done(),
+        "probe_interval": PROBE_INTERVAL,
+        "tenants": tenants,
+    }
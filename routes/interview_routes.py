@@ -1,28 +1,134 @@
-from flask import Blueprint, jsonify, request
+import os
+import json
+import time
 import asyncio
+from flask import Blueprint, Response, g, jsonify, request
+from utils.async_runtime import iter_async, run_async
 from agent.detect_agent import run_detect_interviews
-from agent.prep_agent import run_prep_from_thread, run_prep_agent
+from agent.prep_agent import (budget_stats, get_prep_cache, stream_prep_from_thread, section_stats,
+                              submit_thread_prep, submit_company_prep)
+from agent.prep_batch import batch_stats, submit_batch_prep
+from agent.precompute import get_scheduler
+from agent.research_cache import get_research_cache
+from utils.tool_args import binding_stats
+from utils.json_parser import parse_stats
+from utils.jobs import get_job_queue, job_result
+from utils.budget import set_budget
+from utils.web_cache import get_web_cache
+from utils.metrics import REQUEST_SECONDS, render_prometheus, start_trace
+from llm_pool import pool_stats, route_stats
+from mcp_client import mcp_stats, set_tenant, tenant_home, verify_tenant
 
 interview_bp = Blueprint("interview", __name__)
 
+@interview_bp.before_request
+def _bind_tenant():
+    # X-PrepHub-User carries a signed tenant token (mcp_client.sign_tenant) that
+    # picks a credential home under MCP_TENANT_ROOT; without one (or without a
+    # root configured) requests use the default mailbox. A token that doesn't
+    # verify is refused rather than quietly served from the default mailbox.
+    # Always set, so a reused worker thread never inherits the previous user.
+    set_tenant(None)
+    token = request.headers.get("X-PrepHub-User")
+    if token and os.environ.get("MCP_TENANT_ROOT"):
+        user = verify_tenant(token)
+        if user is None:
+            return jsonify({"error": "invalid_tenant"}), 401
+        set_tenant(tenant_home(user))
+
+# how long a blocking route waits on its job before answering 504; the job
+# carries on and can be polled at /api/jobs/<id>
+JOB_WAIT_SECONDS = float(os.environ.get("PREP_JOB_WAIT_SECONDS", 300))
+
+@interview_bp.before_request
+def _bind_budget():
+    # X-PrepHub-Deadline-Ms is the caller's own timeout. It bounds the runs this
+    # request drives itself (the SSE stream; never past PREP_DEADLINE) and how
+    # long a blocking route waits on its job, not the job: that has its own
+    # budget and may be shared with other callers.
+    ms = request.headers.get("X-PrepHub-Deadline-Ms")
+    try:
+        seconds = float(ms) / 1000 if ms else None
+    except ValueError:
+        seconds = None
+    set_budget(seconds)
+    g.job_wait = JOB_WAIT_SECONDS if seconds is None else max(0.0, min(seconds, JOB_WAIT_SECONDS))
+
+@interview_bp.before_request
+def _start_trace():
+    # run_async() carries this context into the shared loop, so stages, model
+    # turns and tool calls made for this request land in its trace
+    g.started = time.perf_counter()
+    g.trace = start_trace(request.headers.get("X-PrepHub-Trace") == "1")
+
+@interview_bp.after_request
+def _finish_trace(response):
+    # streamed responses get here before any of their work has run, so they're
+    # left out; so are requests refused by _bind_tenant before the trace started
+    if response.is_streamed or "started" not in g:
+        return response
+    REQUEST_SECONDS.observe(time.perf_counter() - g.started, endpoint=request.endpoint or "unknown",
+                            status=response.status_code)
+    if g.trace is not None:
+        response.headers["Server-Timing"] = g.trace.server_timing()
+        response.headers["X-PrepHub-Trace-Id"] = g.trace.id
+    return response
+
 @interview_bp.route("/api/interviews/today", methods=["GET"])
 def get_today_interviews():
     try:
-        data = asyncio.run(run_detect_interviews())
+        # ?full=1 bypasses the local thread store and rescans the whole window
+        full = request.args.get("full") == "1"
+        data = run_async(run_detect_interviews(incremental=False if full else None))
         return jsonify(data)
     except Exception as e:
         print("[/api/interviews/today] ERROR:", repr(e))
         return jsonify({"interviews": [], "error": "detect_failed"}), 200
 
+class _JobTimeout(Exception):
+    def __init__(self, job):
+        super().__init__(f"job {job.id} still {job.status}")
+        self.job = job
+
+async def _await_job(submit, wait: float):
+    job = await submit
+    try:
+        return await job_result(job, wait)
+    except asyncio.TimeoutError:
+        raise _JobTimeout(job) from None
+
+def _job_timeout(e: _JobTimeout, body: dict):
+    return jsonify({**body, "error": "job_timeout", "job": e.job.to_dict()}), 504
+
 @interview_bp.route("/api/prep/<thread_id>", methods=["GET"])
 def get_prep_by_thread(thread_id):
     try:
-        data = asyncio.run(run_prep_from_thread(thread_id))
+        # coalesces with any queued/running job for the same thread
+        data = run_async(_await_job(submit_thread_prep(thread_id), g.job_wait))
         return jsonify({"brief": data})
+    except _JobTimeout as e:
+        return _job_timeout(e, {"brief": {}})
     except Exception as e:
         print("[/api/prep/<id>] ERROR:", repr(e))
         return jsonify({"brief": {},"error":"prep_failed"}), 200
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@interview_bp.route("/api/prep/<thread_id>/stream", methods=["GET"])
+def stream_prep_by_thread(thread_id):
+    """Server-sent events: progress, tool calls and plan sections as they become available."""
+    def generate():
+        try:
+            for ev in iter_async(stream_prep_from_thread(thread_id)):
+                yield _sse(ev["event"], ev["data"])
+        except Exception as e:
+            print("[/api/prep/<id>/stream] ERROR:", repr(e))
+            yield _sse("error", {"error": "prep_failed"})
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 
 
 
@@ -34,5 +140,132 @@ def build_prep_from_body():
     if not company:
         return jsonify({"error": "company_required"}), 400
 
-    result = asyncio.run(run_prep_agent(company, role))
+    mode = data.get("mode")  # "single" | "sections"
+    try:
+        result = run_async(_await_job(submit_company_prep(company, role, mode), g.job_wait))
+    except _JobTimeout as e:
+        return _job_timeout(e, {"brief": {}})
     return jsonify({"brief": result})
+
+
+def _thread_ids_from_body():
+    data = request.get_json(force=True) or {}
+    ids = data.get("thread_ids")
+    return [str(t) for t in ids if t] if isinstance(ids, list) else []
+
+
+@interview_bp.route("/api/prep/batch", methods=["POST"])
+def build_prep_batch():
+    """Briefs for many threads in one call; companies shared across threads are researched once."""
+    thread_ids = _thread_ids_from_body()
+    if not thread_ids:
+        return jsonify({"error": "thread_ids_required"}), 400
+    try:
+        return jsonify(run_async(_await_job(submit_batch_prep(thread_ids), g.job_wait)))
+    except _JobTimeout as e:
+        return _job_timeout(e, {"briefs": {}})
+    except Exception as e:
+        print("[/api/prep/batch] ERROR:", repr(e))
+        return jsonify({"briefs": {}, "error": "prep_failed"}), 200
+
+
+# ---------- Background jobs ----------
+# Submit returns 202 + job id straight away; poll GET /api/jobs/<id>
+# (optionally ?wait=<seconds> to long-poll) or subscribe to its events.
+
+@interview_bp.route("/api/jobs/prep/<thread_id>", methods=["POST"])
+def submit_prep_job(thread_id):
+    job = run_async(submit_thread_prep(thread_id))
+    return jsonify({"job": job.to_dict()}), 202
+
+
+@interview_bp.route("/api/jobs/prep/build", methods=["POST"])
+def submit_build_job():
+    data = request.get_json(force=True) or {}
+    company = data.get("company")
+    if not company:
+        return jsonify({"error": "company_required"}), 400
+    job = run_async(submit_company_prep(company, data.get("role", ""), data.get("mode")))
+    return jsonify({"job": job.to_dict()}), 202
+
+
+@interview_bp.route("/api/jobs/prep/batch", methods=["POST"])
+def submit_batch_job():
+    thread_ids = _thread_ids_from_body()
+    if not thread_ids:
+        return jsonify({"error": "thread_ids_required"}), 400
+    job = run_async(submit_batch_prep(thread_ids))
+    return jsonify({"job": job.to_dict()}), 202
+
+
+@interview_bp.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    try:
+        wait = min(float(request.args.get("wait", 0) or 0), 60.0)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+    job = run_async(get_job_queue().wait(job_id, wait)) if wait > 0 else get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "job_not_found"}), 404
+    return jsonify({"job": job.to_dict()})
+
+
+@interview_bp.route("/api/jobs/<job_id>/events", methods=["GET"])
+def stream_job(job_id):
+    """Server-sent events: one `job` event per status change, the last one carries the result."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "job_not_found"}), 404
+
+    def generate():
+        for state in iter_async(job.updates()):
+            yield _sse("job", state)
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@interview_bp.route("/api/jobs/stats", methods=["GET"])
+def get_job_stats():
+    return jsonify(get_job_queue().stats())
+
+
+@interview_bp.route("/api/cache/stats", methods=["GET"])
+def get_cache_stats():
+    prep_cache = get_prep_cache()
+    research_cache = get_research_cache()
+    web_cache = get_web_cache()
+    return jsonify({
+        "prep_briefs": prep_cache.stats() if prep_cache else None,
+        "research": research_cache.stats() if research_cache else None,
+        "web_tools": web_cache.stats() if web_cache else None,
+    })
+
+
+@interview_bp.route("/api/tools/stats", methods=["GET"])
+def get_tool_stats():
+    return jsonify({**binding_stats(), "llm_pool": pool_stats()})
+
+
+@interview_bp.route("/api/mcp/stats", methods=["GET"])
+def get_mcp_stats():
+    """Server liveness plus startup / probe / respawn timings."""
+    return jsonify(mcp_stats())
+
+
+@interview_bp.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus text format: stage / model / tool latency, tokens, ReAct steps, JSON repair rate."""
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@interview_bp.route("/api/prep/stats", methods=["GET"])
+def get_prep_stats():
+    return jsonify({"sections": section_stats(), "json_parse": parse_stats(), "batch": batch_stats(),
+                    "precompute": get_scheduler().snapshot(), "routing": route_stats(), "budget": budget_stats()})
+
+
+@interview_bp.route("/api/precompute/run", methods=["POST"])
+def run_precompute():
+    """Run one detect + warm pass now (same limits as the background scheduler)."""
+    return jsonify(run_async(get_scheduler().run_once()))
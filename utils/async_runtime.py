@@ -0,0 +1,103 @@
+# utils/async_runtime.py
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, Set
+
+# One event loop for the whole process. Flask handlers are sync and run on
+# worker threads; they hand coroutines to this loop instead of spinning up a
+# fresh loop per request with asyncio.run(). Anything loop-bound (MCP stdio
+# sessions, asyncio locks, async model clients) is created here once and
+# stays valid for the life of the process.
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_start_lock = threading.Lock()
+_background: Set[asyncio.Task] = set()  # strong refs so fire-and-forget tasks aren't GC'd
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its thread on first use."""
+    global _loop, _thread
+    if _loop is not None and _loop.is_running():
+        return _loop
+    with _start_lock:
+        if _loop is not None and _loop.is_running():
+            return _loop
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        thread = threading.Thread(target=_run_loop, args=(loop, ready), name="prephub-loop", daemon=True)
+        thread.start()
+        ready.wait()
+        _loop, _thread = loop, thread
+        return _loop
+
+
+def in_loop_thread() -> bool:
+    return _thread is not None and threading.current_thread() is _thread
+
+
+def submit(coro: Awaitable[Any]) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared loop from any thread."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Blocking bridge for sync code (Flask routes): run `coro` on the shared
+    loop and wait for its result. Must not be called from the loop itself.
+    """
+    if in_loop_thread():
+        raise RuntimeError("run_async() called from the shared loop; await the coroutine instead")
+    fut = submit(coro)
+    try:
+        return fut.result(timeout)
+    except concurrent.futures.TimeoutError:
+        fut.cancel()
+        raise
+
+
+def iter_async(agen: AsyncIterator[Any], timeout: Optional[float] = None) -> Iterator[Any]:
+    """
+    Blocking bridge for async generators: pull items off `agen` on the shared
+    loop and yield them to sync code (e.g. a Flask streaming response). Closing
+    the iterator early (client went away) closes the async generator too.
+    """
+    loop = get_loop()
+    try:
+        while True:
+            try:
+                item = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result(timeout)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result(timeout)
+
+
+def spawn(coro: Awaitable[Any]) -> None:
+    """Fire-and-forget a coroutine on the shared loop (callable from any thread)."""
+    if in_loop_thread():
+        task = asyncio.ensure_future(coro)
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    else:
+        submit(coro)
+
+
+def shutdown(timeout: float = 5.0) -> None:
+    """Stop the shared loop (tests / clean process exit)."""
+    global _loop, _thread
+    loop, thread = _loop, _thread
+    if loop is None:
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout)
+    _loop, _thread = None, None
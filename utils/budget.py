@@ -0,0 +1,128 @@
+# utils/budget.py
+import os
+import time
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage
+from langgraph.errors import GraphRecursionError
+
+# Limits for agent runs. A route binds a RunBudget (deadline from
+# X-PrepHub-Deadline-Ms, else PREP_DEADLINE seconds); it follows the request
+# through contextvars into the shared loop. Work that outlives or is shared
+# beyond one request (queued jobs, background research) starts its own
+# budget with own_budget()/set_budget(), so one caller's short deadline or
+# a long batch never cuts it short for others; a batch likewise starts one
+# per thread once that thread gets a worker slot. run_bounded() drives a ReAct graph
+# step by step and stops it when the deadline passes or the run reaches its
+# model-turn or tool-call cap; callers then force a final answer or return
+# a partial, flagged brief.
+
+DEADLINE = float(os.environ.get("PREP_DEADLINE", 120))
+MAX_STEPS = int(os.environ.get("PREP_MAX_STEPS", 8))            # model turns per agent run
+MAX_TOOL_CALLS = int(os.environ.get("PREP_MAX_TOOL_CALLS", 10))  # tool calls per agent run
+GRACE = float(os.environ.get("PREP_FINALIZE_GRACE", 10))          # for the forced final answer
+
+DEADLINE_HIT = "deadline"
+STEP_BUDGET = "step_budget"
+TOOL_BUDGET = "tool_budget"
+
+
+class RunBudget:
+    def __init__(self, seconds: float = DEADLINE, max_steps: int = MAX_STEPS, max_tool_calls: int = MAX_TOOL_CALLS):
+        self.deadline = time.monotonic() + max(0.0, seconds)
+        self.max_steps = max(1, max_steps)
+        self.max_tool_calls = max(0, max_tool_calls)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"remaining_s": round(self.remaining(), 1), "max_steps": self.max_steps,
+                "max_tool_calls": self.max_tool_calls}
+
+
+def budget_config() -> Dict[str, Any]:
+    return {"deadline_s": DEADLINE, "max_steps": MAX_STEPS, "max_tool_calls": MAX_TOOL_CALLS, "grace_s": GRACE}
+
+
+_budget: contextvars.ContextVar[Optional[RunBudget]] = contextvars.ContextVar("prephub_budget", default=None)
+
+
+def set_budget(seconds: Optional[float] = None) -> RunBudget:
+    """Bind a fresh budget to the current context (seconds capped at PREP_DEADLINE)."""
+    budget = RunBudget(DEADLINE if seconds is None else min(seconds, DEADLINE))
+    _budget.set(budget)
+    return budget
+
+
+async def own_budget(run: Awaitable[Any]) -> Any:
+    """Await `run` under a fresh default budget (job factories: the job, not its first submitter, owns it)."""
+    set_budget()
+    return await run
+
+
+def current_budget() -> RunBudget:
+    """The request's budget; background work without one gets a default budget per call."""
+    return _budget.get() or RunBudget()
+
+
+def graph_config(budget: RunBudget) -> Dict[str, Any]:
+    # a ReAct step is a model node plus a tools node; the cap is a backstop for over_budget()
+    return {"recursion_limit": 2 * budget.max_steps + 2}
+
+
+def finalize_timeout(budget: RunBudget) -> float:
+    """Time allowed for a finishing model call: what's left, but never less than GRACE."""
+    return max(budget.remaining(), GRACE)
+
+
+def over_budget(msgs: List[Any], budget: RunBudget) -> Optional[str]:
+    """Stop reason if the run's last model turn asks for tools it has no budget left for."""
+    turns = [m for m in msgs if isinstance(m, AIMessage)]
+    pending = turns[-1].tool_calls if turns and msgs[-1] is turns[-1] else []
+    if not pending:
+        return None  # final answer (or tool results) in hand: let the graph finish
+    if len(turns) >= budget.max_steps:
+        return STEP_BUDGET
+    if sum(len(t.tool_calls or []) for t in turns) > budget.max_tool_calls:
+        return TOOL_BUDGET
+    return None
+
+
+async def run_bounded(agent: Any, messages: List[Any],
+                      budget: Optional[RunBudget] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run a ReAct graph within `budget`. Returns (messages so far, stop reason),
+    where the reason is None when the agent finished on its own. A stopped run
+    ends on the model turn whose tool calls would have gone over the limit;
+    those calls are never executed.
+    """
+    budget = budget or current_budget()
+    state: List[Any] = list(messages)
+    reason: Optional[str] = None
+    config = graph_config(budget)
+
+    async def drive() -> None:
+        nonlocal state, reason
+        stream = agent.astream({"messages": messages}, config=config, stream_mode="values")
+        try:
+            async for snapshot in stream:
+                state = snapshot.get("messages", state) if isinstance(snapshot, dict) else state
+                reason = over_budget(state, budget)
+                if reason:
+                    return
+        finally:
+            await stream.aclose()
+
+    try:
+        await asyncio.wait_for(drive(), budget.remaining())
+    except asyncio.TimeoutError:
+        reason = DEADLINE_HIT
+    except GraphRecursionError:
+        reason = STEP_BUDGET
+    return state, reason
@@ -0,0 +1,144 @@
+# utils/email_context.py
+import re
+import html
+import math
+from typing import Any, Dict, List, Tuple
+
+# Builds the EMAIL THREAD CONTEXT block for prep prompts. Recruiting threads
+# are mostly repeated quoted history, signatures and HTML; a blind character
+# cut keeps the oldest (most repeated) text and drops the newest messages.
+# Here we clean each message, drop blocks we've already seen, rank messages
+# (newest, scheduling and JD content first) and pack them into a token budget.
+
+CHARS_PER_TOKEN = 4  # close enough for English prose with Gemini/GPT tokenizers
+
+_QUOTE_HEADER_RE = re.compile(
+    r"^\s*(On .{0,200}wrote:\s*$|-{2,}\s*Original Message\s*-{2,}|_{10,}\s*$|"
+    r"From:\s.+\n\s*(Sent|Date):\s)",
+    re.I | re.M,
+)
+_SIGNOFF_RE = re.compile(
+    r"^\s*(best( regards)?|regards|kind regards|warm regards|thanks|thank you|cheers|sincerely)[,!.]?\s*$",
+    re.I,
+)
+_SIG_FACTS_RE = re.compile(
+    r"https?://|www\.|\b\d{1,2}(:\d{2})?\s?(am|pm)\b|\b\d{1,2}/\d{1,2}\b|"
+    r"\b(mon|tues?|wed(nes)?|thu(rs)?|fri|sat(ur)?|sun)(day)?\b|"
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.? \d{1,2}\b", re.I)
+_SIG_MARKERS_RE = re.compile(r"^(--\s*|sent from my .+|get outlook for .+)$", re.I)
+_BLOCK_TAGS_RE = re.compile(r"<\s*(br|/p|/div|/li|/tr|/h\d)\s*/?>", re.I)
+
+_SCHEDULING_RE = re.compile(
+    r"\b(interview|schedul\w*|availability|available|calendly|zoom|google meet|onsite|phone screen|"
+    r"\d{1,2}(:\d{2})?\s?(am|pm)|monday|tuesday|wednesday|thursday|friday|time ?slot)\b", re.I)
+_JD_RE = re.compile(
+    r"\b(responsibilit\w*|requirements?|qualifications?|job description|the role|you will|"
+    r"what you.ll do|must have|nice to have|experience with)\b", re.I)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def strip_html(text: str) -> str:
+    if "<" not in text:
+        return text
+    text = re.sub(r"<(script|style)[^>]*>.*?</\1>", " ", text, flags=re.S | re.I)
+    text = _BLOCK_TAGS_RE.sub("\n", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    return html.unescape(text)
+
+
+def strip_quoted(text: str) -> str:
+    """Drop quoted reply history: everything after an 'On ... wrote:' style header, and '>' lines."""
+    m = _QUOTE_HEADER_RE.search(text)
+    if m and text[:m.start()].strip():  # a header at the very top is a forward: keep it
+        text = text[:m.start()]
+    return "\n".join(line for line in text.splitlines() if not line.lstrip().startswith(">"))
+
+
+def _is_signature(lines: List[str]) -> bool:
+    """Lines after a sign-off: a few short ones (name, title, phone) with no links, dates or times."""
+    lines = [line.strip() for line in lines if line.strip()]
+    return len(lines) <= 6 and all(len(line) <= 60 and not _SIG_FACTS_RE.search(line) for line in lines)
+
+
+def strip_signature(text: str) -> str:
+    lines = text.rstrip().splitlines()
+    tail_start = max(0, len(lines) - 12)  # signatures live at the bottom
+    end = len(lines)
+    # bottom up: the last sign-off is the one that starts the signature; an
+    # earlier "Thanks," is part of the message
+    for i in range(len(lines) - 1, tail_start - 1, -1):
+        if _SIG_MARKERS_RE.match(lines[i].strip()):
+            end = i
+        elif _SIGNOFF_RE.match(lines[i]):
+            if _is_signature(lines[i + 1:end]):
+                end = i + 1  # keep the sign-off, drop name/title/phone
+            break
+    return "\n".join(lines[:end]) if end < len(lines) else text
+
+
+def clean_body(text: str) -> str:
+    text = strip_signature(strip_quoted(strip_html(text or "")))
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"^ | $", "", text, flags=re.M)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+def _norm(block: str) -> str:
+    return re.sub(r"\W+", " ", block.lower()).strip()
+
+
+def _score(index: int, total: int, text: str) -> float:
+    recency = (index + 1) / total  # newest message -> 1.0
+    score = 2.0 * recency
+    if _SCHEDULING_RE.search(text):
+        score += 1.5
+    if _JD_RE.search(text):
+        score += 3.0  # the JD usually sits in the oldest message; don't let recency bury it
+    return score
+
+
+def build_email_context(messages: List[Dict[str, Any]], budget_tokens: int) -> Tuple[str, Dict[str, int]]:
+    """
+    messages: oldest-first [{from, subject, body}]. Returns (context_text, stats).
+    Selected messages are emitted in chronological order.
+    """
+    seen = set()
+    cleaned: List[Tuple[int, str]] = []
+    # newest first, so a repeated block survives in the most recent message
+    for i in range(len(messages) - 1, -1, -1):
+        m = messages[i]
+        blocks = []
+        for block in re.split(r"\n\s*\n", clean_body(m.get("body") or "")):
+            key = _norm(block)
+            if len(key) > 40 and key in seen:
+                continue  # repeated paragraph (forwarded JD, re-pasted availability, ...)
+            seen.add(key)
+            blocks.append(block)
+        header = f"From: {m.get('from') or ''}\nSubject: {m.get('subject') or ''}\n"
+        cleaned.append((i, header + "\n" + "\n\n".join(blocks) + "\n"))
+
+    cleaned.reverse()
+    total = len(cleaned)
+    ranked = sorted(cleaned, key=lambda x: _score(x[0], total, x[1]), reverse=True)
+    chosen: Dict[int, str] = {}
+    remaining = budget_tokens - 16  # room for the "omitted" marker
+    for i, text in ranked:
+        cost = estimate_tokens(text) + 2  # + separator
+        if cost <= remaining:
+            chosen[i] = text
+            remaining -= cost
+        elif remaining > 64:  # room for a useful slice of this one
+            chosen[i] = text[:(remaining - 8) * CHARS_PER_TOKEN].rstrip() + "\n[...truncated]\n"
+            remaining = 0
+        if remaining <= 0:
+            break
+
+    parts = [chosen[i] for i in sorted(chosen)]
+    omitted = total - len(chosen)
+    if omitted:
+        parts.insert(0, f"[{omitted} lower-priority message(s) omitted]\n")
+    text = "\n\n---\n\n".join(parts)
+    return text, {"messages": total, "included": len(chosen), "tokens": estimate_tokens(text)}
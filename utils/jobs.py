@@ -0,0 +1,210 @@
+# utils/jobs.py
+import os
+import time
+import uuid
+import asyncio
+import contextvars
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# In-process job queue for long agent runs. A submit returns a job id right
+# away; a fixed number of worker tasks on the shared loop drain the queue.
+# Jobs are keyed (e.g. "thread:<id>"): while a job for a key is queued or
+# running, further submits for that key attach to it instead of starting a
+# second identical agent run. Finished jobs are kept (bounded) for polling.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+JobFactory = Callable[[], Awaitable[Any]]
+
+
+class Job:
+    def __init__(self, kind: str, key: str, factory: JobFactory):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.factory = factory
+        self.context = contextvars.copy_context()  # submitter's context (e.g. which mailbox)
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.subscribers = 1  # submits coalesced onto this job, including the first
+        self.done = asyncio.Event()
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, ERROR)
+
+    async def _set(self, status: str) -> None:
+        self.status = status
+        async with self._changed:
+            self._changed.notify_all()
+        if self.finished:
+            self.done.set()
+
+    async def updates(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's state now and on every status change until it finishes."""
+        last = None
+        while True:
+            if self.status != last:
+                last = self.status
+                yield self.to_dict()
+            if self.finished:
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.status != last)
+
+    def to_dict(self, with_result: bool = True) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "subscribers": self.subscribers,
+            "created_at": self.created_at,
+            "queued_ms": round(((self.started_at or time.time()) - self.created_at) * 1000, 1),
+            "run_ms": round((self.finished_at - self.started_at) * 1000, 1)
+            if self.finished_at and self.started_at else None,
+        }
+        if self.error:
+            out["error"] = self.error
+        if with_result and self.status == DONE:
+            out["result"] = self.result
+        return out
+
+
+class JobQueue:
+    """
+    Bounded worker pool over an asyncio.Queue. All methods must run on the
+    shared loop (utils.async_runtime); routes go through run_async().
+    """
+
+    def __init__(self, workers: int = 4, retain: int = 500):
+        self.workers = max(1, workers)
+        self.retain = retain
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}  # key -> queued/running job
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.ensure_future(self._worker()))
+
+    async def submit(self, kind: str, key: str, factory: JobFactory) -> Job:
+        """Queue `factory` under `key`, or return the job already queued/running for it."""
+        job = self._active.get(key)
+        if job is not None:
+            job.subscribers += 1
+            self.coalesced += 1
+            return job
+        self._ensure_workers()
+        job = Job(kind, key, factory)
+        self._active[key] = job
+        self._jobs[job.id] = job
+        self._evict()
+        self.submitted += 1
+        self._queue.put_nowait(job)
+        return job
+
+    def active(self, key: str) -> Optional[Job]:
+        """The queued/running job for `key`, if any."""
+        return self._active.get(key)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """The job, after it finished or `timeout` seconds passed (long polling)."""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.started_at = time.time()
+            await job._set(RUNNING)
+            status = ERROR
+            try:
+                job.result = await asyncio.get_running_loop().create_task(job.factory(), context=job.context)
+                status = DONE
+                self.completed += 1
+            except BaseException as e:
+                # a job that dies of CancelledError (or worse) still fails like any other
+                job.error = repr(e)
+                self.failed += 1
+                print(f"[jobs] {job.kind} job {job.key!r} failed:", repr(e))
+                if isinstance(e, asyncio.CancelledError):
+                    if asyncio.current_task().cancelling():
+                        raise  # the worker itself is being cancelled (loop shutdown)
+                elif not isinstance(e, Exception):
+                    raise  # KeyboardInterrupt / SystemExit
+            finally:
+                job.finished_at = time.time()
+                job.factory = job.context = None  # drop the closure (and whatever it captured)
+                self._active.pop(job.key, None)
+                await job._set(status)
+                self._queue.task_done()
+
+    def _evict(self) -> None:
+        # oldest finished jobs go first; queued/running ones are never dropped
+        excess = len(self._jobs) - self.retain
+        for job_id in [j for j, job in self._jobs.items() if job.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "jobs": by_status,
+        }
+
+
+async def job_result(job: Job, timeout: Optional[float] = None) -> Any:
+    """
+    Wait for `job` and return its result (sync routes). Raises if the job
+    failed, asyncio.TimeoutError after `timeout` seconds; the job itself keeps
+    running for whoever else is attached to it.
+    """
+    await asyncio.wait_for(job.done.wait(), timeout)
+    if job.status == ERROR:
+        raise RuntimeError(job.error or "job failed")
+    return job.result
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            workers=int(os.environ.get("PREP_JOB_WORKERS", 4)),
+            retain=int(os.environ.get("PREP_JOB_RETAIN", 500)),
+        )
+    return _job_queue
@@ -1,7 +1,28 @@
 # utils/json_parser.py
 import json
 import re
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from utils.metrics import counter
+
+# LLM output is "almost JSON": fenced, wrapped in prose, single-quoted, with
+# trailing commas or cut off mid-object when the model hits its token limit.
+# The strict paths below are tried first (they're the common case and fast);
+# anything else goes through one string-aware, tolerant pass that recovers
+# what it can. Only text with no JSON structure at all raises, which is the
+# one case worth an LLM repair round trip.
+
+_stats = {"strict": 0, "repaired": 0, "failed": 0}
+_PARSES = counter("prephub_json_parse_total",
+                  "safe_extract_json outcomes; how=failed is what falls back to an LLM repair call.")
+
+_WS = " \t\r\n"
+_LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None, "undefined": None,
+}
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_BARE_RE = re.compile(r"[A-Za-z_$][\w$-]*")
 
 def _strip_code_fences(s: str) -> str:
     s = s.strip()
@@ -18,60 +39,366 @@ def _load_if_json(s: str) -> Optional[Any]:
     except Exception:
         return None
 
-def _extract_balanced_block(s: str, opener: str, closer: str) -> Optional[str]:
-    start = s.find(opener)
-    if start == -1:
+def _as_text(content: Any) -> str:
+    # chat models may return a list of content blocks instead of a string
+    if isinstance(content, list):
+        return "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in content)
+    return content if isinstance(content, str) else str(content)
+
+# ---------- Tolerant single-pass parser ----------
+
+class _Tolerant:
+    """
+    Recursive-descent parser over a relaxed JSON grammar: single quotes,
+    unquoted keys, trailing/missing commas, comments, Python literals and
+    truncated input (open strings/containers are closed at end of text).
+    """
+
+    def __init__(self, s: str):
+        self.s = s
+        self.i = 0
+        self.n = len(s)
+        self.bare = 0  # bare words taken as string values (prose, unless inside an object)
+
+    def _skip(self) -> None:
+        s, n = self.s, self.n
+        while self.i < n:
+            ch = s[self.i]
+            if ch in _WS:
+                self.i += 1
+            elif s.startswith("//", self.i) or ch == "#":
+                nl = s.find("\n", self.i)
+                self.i = n if nl == -1 else nl + 1
+            elif s.startswith("/*", self.i):
+                end = s.find("*/", self.i + 2)
+                self.i = n if end == -1 else end + 2
+            else:
+                return
+
+    def value(self) -> Any:
+        self._skip()
+        if self.i >= self.n:
+            raise EOFError
+        ch = self.s[self.i]
+        if ch == "{":
+            return self._object()
+        if ch == "[":
+            return self._array()
+        if ch in "\"'":
+            return self._string()
+        m = _NUMBER_RE.match(self.s, self.i)
+        if m:
+            self.i = m.end()
+            text = m.group(0)
+            try:
+                return int(text) if text.lstrip("-").isdigit() else float(text)
+            except ValueError:
+                return text
+        m = _BARE_RE.match(self.s, self.i)
+        if m:
+            self.i = m.end()
+            word = m.group(0)
+            if word not in _LITERALS:
+                self.bare += 1
+            return _LITERALS.get(word, word)
+        raise ValueError(f"unexpected {ch!r} at {self.i}")
+
+    def _string(self) -> str:
+        s, quote = self.s, self.s[self.i]
+        self.i += 1
+        out: List[str] = []
+        while self.i < self.n:
+            ch = s[self.i]
+            if ch == quote:
+                self.i += 1
+                return "".join(out)
+            if ch == "\\" and self.i + 1 < self.n:
+                nxt = s[self.i + 1]
+                if nxt == "u" and self.i + 6 <= self.n:
+                    try:
+                        out.append(chr(int(s[self.i + 2:self.i + 6], 16)))
+                        self.i += 6
+                        continue
+                    except ValueError:
+                        pass
+                out.append(_ESCAPES.get(nxt, nxt))
+                self.i += 2
+                continue
+            out.append(ch)
+            self.i += 1
+        return "".join(out)  # truncated: close the string
+
+    def _key(self) -> str:
+        ch = self.s[self.i]
+        if ch in "\"'":
+            return self._string()
+        m = _BARE_RE.match(self.s, self.i)
+        if not m:
+            raise ValueError(f"bad key at {self.i}")
+        self.i = m.end()
+        return m.group(0)
+
+    def _object(self) -> Dict[str, Any]:
+        self.i += 1
+        out: Dict[str, Any] = {}
+        while True:
+            self._skip()
+            if self.i >= self.n:
+                return out
+            ch = self.s[self.i]
+            if ch == "}":
+                self.i += 1
+                return out
+            if ch == ",":
+                self.i += 1
+                continue
+            if ch == "]":  # mismatched closer: treat as ours
+                self.i += 1
+                return out
+            key = self._key()
+            self._skip()
+            if self.i >= self.n:
+                return out  # dangling key, no value
+            if self.s[self.i] not in ":=":
+                continue  # stray word between members
+            self.i += 1
+            try:
+                out[key] = self.value()
+            except EOFError:
+                return out
+
+    def _array(self) -> List[Any]:
+        self.i += 1
+        out: List[Any] = []
+        while True:
+            self._skip()
+            if self.i >= self.n:
+                return out
+            ch = self.s[self.i]
+            if ch == "]":
+                self.i += 1
+                return out
+            if ch == ",":
+                self.i += 1
+                continue
+            if ch == "}":
+                self.i += 1
+                return out
+            try:
+                out.append(self.value())
+            except EOFError:
+                return out
+
+def _array_first(s: str) -> Tuple[int, int]:
+    """(array start, object start); the array start is -1 unless a "[" comes before the first "{"."""
+    obj_at, arr_at = s.find("{"), s.find("[")
+    return (arr_at if arr_at != -1 and (obj_at == -1 or arr_at < obj_at) else -1), obj_at
+
+def _tolerant_parse(s: str) -> Optional[Any]:
+    """
+    Relaxed parse of the first non-empty object in `s`, else the first array;
+    None if there is no structure to recover. A leading array only wins when
+    it encloses that object (a list of objects) and holds real values, so
+    "see [1]" or "[the thread]" in prose never shadows the JSON after it.
+    Each retry resumes where the last one stopped, so prose like
+    "see {this}: {...}" still costs a single pass per bracket kind.
+    """
+    p = _Tolerant(s)
+
+    def attempt(pos: int) -> Optional[Any]:
+        p.i, p.bare = pos, 0
+        try:
+            return p.value()
+        except (ValueError, EOFError, RecursionError):
+            return None
+
+    arr_at, obj_at = _array_first(s)
+    if arr_at != -1:
+        value = attempt(arr_at)
+        if value and not p.bare and (obj_at == -1 or p.i > obj_at):
+            return value
+    for opener in "{[":
+        pos = s.find(opener)
+        while pos != -1:
+            value = attempt(pos)
+            if value and (opener == "{" or not p.bare):
+                return value
+            pos = s.find(opener, max(p.i, pos + 1))
+    return None
+
+def _raw_decode(s: str) -> Optional[Any]:
+    """
+    Strict parse of the first JSON object, ignoring prose before and after it.
+    An array is taken only when there is no object or the array encloses it.
+    """
+    decoder = json.JSONDecoder()
+    arr_at, obj_at = _array_first(s)
+    broken_array = False
+    if arr_at != -1:
+        try:
+            value, end = decoder.raw_decode(s, arr_at)
+            if obj_at == -1 or end > obj_at:
+                return value
+        except ValueError:
+            broken_array = True
+    if obj_at == -1:
         return None
-    depth = 0
-    for i in range(start, len(s)):
-        ch = s[i]
-        if ch == opener:
-            depth += 1
-        elif ch == closer:
-            depth -= 1
-            if depth == 0:
-                return s[start:i+1]
-    return None  # unbalanced
-
-def safe_extract_json(text: str):
+    try:
+        value, end = decoder.raw_decode(s, obj_at)
+    except ValueError:
+        return None
+    if broken_array and s[end:].lstrip(_WS)[:1] in (",", "]"):
+        return None  # an element of a broken array; the tolerant pass keeps the array
+    return value
+
+# ---------- Incremental parser for streamed output ----------
+
+_STREAM_SPECIAL_RE = re.compile(r"[\"'\\{}\[\],:]")
+
+class StreamingJSONObject:
+    """
+    Incremental parser for one streamed top-level JSON object. feed() takes the
+    next chunk of model output and returns the (key, value) members that closed
+    in it, so a caller can act on each section while generation is still
+    running. Every character is scanned once and each member's text is decoded
+    once when it closes, so total work is linear in the output size.
+
+    Prose or code fences before the object are skipped; a leading "{...}" that
+    yields no members (braces in prose) is ignored and scanning continues.
+    Member values go through json.loads, then the tolerant parser.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []   # text from _base onwards, as received
+        self._base = 0                # absolute offset of _parts[0][0]
+        self._pos = 0                 # absolute offset of the next unread chunk
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._esc_at = -1             # absolute offset of an escaped character
+        self._member_start: Optional[int] = None
+        self._val_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._members = 0
+        self.done = False
+
+    def _text(self, start: int, end: int) -> str:
+        s = "".join(self._parts)
+        self._parts = [s]
+        return s[start - self._base:end - self._base]
+
+    def _drop_before(self, offset: int) -> None:
+        s = "".join(self._parts)
+        self._parts = [s[offset - self._base:]]
+        self._base = offset
+
+    def _close_member(self, end: int, out: List[Tuple[str, Any]]) -> None:
+        if self._key is not None and self._val_start is not None:
+            raw = self._text(self._val_start, end).strip()
+            value = _load_if_json(raw)
+            if value is None and raw not in ("null", "None"):
+                value = _Tolerant(raw).value() if raw else None
+            out.append((self._key, value))
+            self._members += 1
+        self._key, self._val_start = None, None
+        self._drop_before(end + 1)
+        self._member_start = end + 1
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        out: List[Tuple[str, Any]] = []
+        if self.done or not chunk:
+            return out
+        if not self._parts:
+            self._base = self._pos
+        offset = self._pos
+        self._parts.append(chunk)
+        self._pos += len(chunk)
+
+        for m in _STREAM_SPECIAL_RE.finditer(chunk):
+            at = offset + m.start()
+            if at == self._esc_at:
+                continue
+            ch = m.group()
+            if self._depth == 0:
+                if ch == "{":  # quotes/brackets in leading prose don't count
+                    self._depth = 1
+                    self._drop_before(at + 1)
+                    self._member_start = at + 1
+                continue
+            if self._quote is not None:
+                if ch == "\\":
+                    self._esc_at = at + 1
+                elif ch == self._quote:
+                    self._quote = None
+                continue
+            if ch in "\"'":
+                self._quote = ch
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        self._close_member(at, out)
+                    except (ValueError, EOFError, RecursionError):
+                        pass
+                    if self._members:
+                        self.done = True
+                        self._parts = []
+                        return out
+                    self._member_start = None  # "{...}" in prose; keep looking
+            elif self._depth == 1 and ch == ":" and self._val_start is None:
+                raw_key = self._text(self._member_start, at).strip()
+                self._key = _Tolerant(raw_key)._string() if raw_key and raw_key[0] in "\"'" else raw_key
+                self._val_start = at + 1
+            elif self._depth == 1 and ch == ",":
+                try:
+                    self._close_member(at, out)
+                except (ValueError, EOFError, RecursionError):
+                    self._key, self._val_start = None, None
+                    self._member_start = at + 1
+
+        if self._depth == 0:
+            self._parts = []  # nothing worth keeping from prose
+        return out
+
+# ---------- Entry points ----------
+
+def parse_json_tolerant(text: Any) -> Tuple[Optional[Any], str]:
+    """
+    Returns (value, how) with how in {"strict", "repaired", "failed"}.
+    value is a dict/list, or None when nothing could be recovered.
+    """
+    if text is None:
+        return None, "failed"
+    s = _as_text(text)
+
+    direct = _load_if_json(s)
+    if isinstance(direct, (dict, list)):
+        return direct, "strict"
+
+    s = _strip_code_fences(s)
+    direct = _raw_decode(s)
+    if isinstance(direct, (dict, list)):
+        return direct, "strict"
+
+    repaired = _tolerant_parse(s)
+    if isinstance(repaired, (dict, list)) and repaired:
+        return repaired, "repaired"
+    return None, "failed"
+
+def safe_extract_json(text: Any):
     """
     Try very hard to recover a valid JSON object or array from messy LLM output.
     Returns a Python object (dict/list). Raises ValueError if nothing valid found.
     """
     if text is None:
         raise ValueError("No text to parse (got None).")
+    value, how = parse_json_tolerant(text)
+    _stats[how] += 1
+    _PARSES.inc(how=how)
+    if value is None:
+        raise ValueError("No valid JSON found in the string")
+    return value
 
-    # Already JSON-ish?
-    direct = _load_if_json(text)
-    if direct is not None:
-        return direct
-
-    s = _strip_code_fences(text)
-
-    # Try again after fence stripping
-    direct = _load_if_json(s)
-    if direct is not None:
-        return direct
-
-    # Try to extract first balanced object
-    obj = _extract_balanced_block(s, "{", "}")
-    if obj:
-        parsed = _load_if_json(obj)
-        if parsed is not None:
-            return parsed
-
-    # Try to extract first balanced array
-    arr = _extract_balanced_block(s, "[", "]")
-    if arr:
-        parsed = _load_if_json(arr)
-        if parsed is not None:
-            return parsed
-
-    # As a last resort, try the "first JSON-looking object" regex but tighter (non-greedy)
-    m = re.search(r"\{.*?\}", s, flags=re.DOTALL)
-    if m:
-        parsed = _load_if_json(m.group(0))
-        if parsed is not None:
-            return parsed
-
-    raise ValueError("No valid JSON found in the string")
+def parse_stats() -> Dict[str, int]:
+    return dict(_stats)
@@ -0,0 +1,284 @@
+# utils/metrics.py
+import os
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+
+# Process-wide latency / token / tool-call instrumentation. Histograms and
+# counters are rendered in the Prometheus text format at /api/metrics. A
+# request that asks for a trace (X-PrepHub-Trace: 1, or METRICS_TRACE=1 for
+# every request) also gets a Server-Timing header listing its stages, model
+# turns and tool calls; the trace follows the request into the shared loop
+# through contextvars.
+#
+#     with span("prep.agent"):
+#         result = await agent.ainvoke(...)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+STEP_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
+TRACE_MAX_ENTRIES = 60  # keeps the header well under common proxy limits
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help, self.type = name, help, "counter"
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def totals(self, label: str) -> Dict[str, float]:
+        """Count per value of one label, summed over the others."""
+        out: Dict[str, float] = {}
+        with self._lock:
+            for key, n in self._values.items():
+                value = dict(key).get(label, "")
+                out[value] = out.get(value, 0) + n
+        return out
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(k)} {_fmt_num(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.type = name, help, "histogram"
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Labels, List[float]] = {}  # per-bucket counts + [sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def totals(self, label: str) -> Dict[str, Tuple[float, float]]:
+        """(count, sum) per value of one label, summed over the others."""
+        out: Dict[str, Tuple[float, float]] = {}
+        with self._lock:
+            for key, row in self._values.items():
+                value = dict(key).get(label, "")
+                count, total = out.get(value, (0.0, 0.0))
+                out[value] = (count + row[-1], total + row[-2])
+        return out
+
+    def render(self) -> List[str]:
+        out: List[str] = []
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, n in zip(self.buckets, row):
+                    cumulative += n
+                    out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_num(bound)))} {_fmt_num(cumulative)}")
+                out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {_fmt_num(row[-1])}")
+                out.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_num(round(row[-2], 6))}")
+                out.append(f"{self.name}_count{_fmt_labels(key)} {_fmt_num(row[-1])}")
+        return out
+
+
+_registry: Dict[str, Any] = {}
+
+
+def counter(name: str, help: str) -> Counter:
+    """Register (or fetch) a counter. Call at import time of the owning module."""
+    if name not in _registry:
+        _registry[name] = Counter(name, help)
+    return _registry[name]
+
+
+def histogram(name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    if name not in _registry:
+        _registry[name] = Histogram(name, help, buckets)
+    return _registry[name]
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for name, metric in sorted(_registry.items()):
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = histogram("prephub_stage_seconds", "Pipeline stage latency (detect / prep steps).")
+TOOL_SECONDS = histogram("prephub_tool_call_seconds", "MCP tool invocation latency.")
+LLM_SECONDS = histogram("prephub_llm_call_seconds", "Chat model call latency (one ReAct turn or repair call).")
+PROMPT_TOKENS = histogram("prephub_llm_prompt_tokens", "Prompt tokens per model call.", TOKEN_BUCKETS)
+COMPLETION_TOKENS = histogram("prephub_llm_completion_tokens", "Completion tokens per model call.", TOKEN_BUCKETS)
+REQUEST_SECONDS = histogram("prephub_request_seconds", "HTTP request latency by endpoint.")
+
+# ---------- Per-request trace ----------
+
+class Trace:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float, str]] = []  # (name, ms, description)
+        self.dropped = 0
+
+    def add(self, name: str, ms: float, desc: str = "") -> None:
+        if len(self.entries) < TRACE_MAX_ENTRIES:
+            self.entries.append((name, ms, desc))
+        else:
+            self.dropped += 1
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, ms, desc in self.entries:
+            d = desc.replace('"', "'")
+            parts.append(f'{name};desc="{d}";dur={ms:.1f}' if desc else f"{name};dur={ms:.1f}")
+        if self.dropped:
+            parts.append(f'truncated;desc="{self.dropped} more entries"')
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("prephub_trace", default=None)
+
+
+def start_trace(enabled: bool) -> Optional[Trace]:
+    """Bind a fresh trace (or none) to the current context; returns it."""
+    trace = Trace() if enabled or os.environ.get("METRICS_TRACE") == "1" else None
+    _trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def _record(hist: Histogram, name: str, seconds: float, desc: str = "", **labels: Any) -> None:
+    hist.observe(seconds, **labels)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds * 1000, desc)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a pipeline stage (sync or async body) into prephub_stage_seconds and the trace."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(STAGE_SECONDS, stage, time.perf_counter() - t0, stage=stage)
+
+# ---------- LangChain hooks (model turns and tool calls) ----------
+
+def _token_usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    for gens in getattr(response, "generations", None) or []:
+        for gen in gens:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """
+    Attached to every pooled chat model (label: model) and every MCP tool.
+    Runs inline so the request's trace context is visible.
+    """
+    run_inline = True
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._started: Dict[Any, Tuple[float, str]] = {}
+
+    def _start(self, run_id: Any, name: str) -> None:
+        self._started[run_id] = (time.perf_counter(), name)
+
+    def _end(self, run_id: Any) -> Tuple[Optional[float], str]:
+        t0, name = self._started.pop(run_id, (None, ""))
+        return (time.perf_counter() - t0 if t0 is not None else None), name
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, self.model or (serialized or {}).get("name") or "unknown")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, self.model or (serialized or {}).get("name") or "unknown")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        seconds, model = self._end(run_id)
+        if seconds is None:
+            return
+        _record(LLM_SECONDS, "llm", seconds, model, model=model, status="ok")
+        prompt, completion = _token_usage(response)
+        if prompt is not None:
+            PROMPT_TOKENS.observe(prompt, model=model)
+        if completion is not None:
+            COMPLETION_TOKENS.observe(completion, model=model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        seconds, model = self._end(run_id)
+        if seconds is not None:
+            _record(LLM_SECONDS, "llm", seconds, model, model=model, status="error")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name") or "unknown")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        seconds, name = self._end(run_id)
+        if seconds is not None:
+            _record(TOOL_SECONDS, "tool", seconds, name, tool=name, status="ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        seconds, name = self._end(run_id)
+        if seconds is not None:
+            _record(TOOL_SECONDS, "tool", seconds, name, tool=name, status="error")
+
+
+_tool_callback = MetricsCallback()
+
+
+def instrument(obj: Any, handler: Optional[MetricsCallback] = None) -> Any:
+    """Add the metrics handler to a chat model or tool's own callbacks (idempotent)."""
+    handler = handler or _tool_callback
+    try:
+        current = getattr(obj, "callbacks", None)
+        if isinstance(current, BaseCallbackManager):
+            if not any(isinstance(h, MetricsCallback) for h in current.handlers):
+                current.add_handler(handler, inherit=False)
+        elif not any(isinstance(h, MetricsCallback) for h in current or []):
+            obj.callbacks = list(current or []) + [handler]
+    except Exception as e:  # not a LangChain runnable we can hook
+        print("[metrics] could not instrument", type(obj).__name__, repr(e))
+    return obj
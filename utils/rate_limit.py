@@ -0,0 +1,39 @@
+# utils/rate_limit.py
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, up to `burst` banked.
+    Not thread-safe; use it from the shared loop only (peek() aside).
+
+        bucket = TokenBucket(rate=20 / 3600, burst=5)   # 20/hour, bursts of 5
+        if bucket.try_acquire(): ...
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(0.0, rate)
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+        self._at = now
+
+    def try_acquire(self, n: float = 1.0) -> bool:
+        self._refill(time.monotonic())
+        if self._tokens >= n:
+            self._tokens -= n
+            return True
+        return False
+
+    @property
+    def available(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+    def peek(self) -> float:
+        """Tokens available now, without refilling: the one read that's safe off the loop (stats)."""
+        tokens, at = self._tokens, self._at
+        return min(self.burst, tokens + max(0.0, time.monotonic() - at) * self.rate)
@@ -0,0 +1,125 @@
+# utils/sqlite_cache.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+
+def cache_dir() -> str:
+    path = os.environ.get("PREPHUB_CACHE_DIR") or _DEFAULT_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class SQLiteCache:
+    """
+    Small on-disk key/value cache with TTL and LRU eviction.
+
+    Values are stored as JSON. Each entry can carry a `tag` (e.g. a thread_id)
+    so a whole family of keys can be dropped at once. Safe to share across
+    threads; every call is a single short transaction.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                 path: Optional[str] = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path or os.path.join(cache_dir(), f"{name}.sqlite")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, tag TEXT NOT NULL DEFAULT '', value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries(tag)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+
+    # ---------- reads ----------
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, created_at) or None. Expired entries count as misses."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    # ---------- writes ----------
+
+    def set(self, key: str, value: Any, tag: str = "", replace_tag: bool = False) -> None:
+        """
+        Store `value`. With replace_tag=True every other entry sharing `tag`
+        is dropped first (used to invalidate stale versions of the same item).
+        """
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            if replace_tag and tag:
+                self._conn.execute("DELETE FROM entries WHERE tag = ? AND key != ?", (tag, key))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, tag, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, tag, payload, now, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def delete_tag(self, tag: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def _evict(self, now: float) -> None:
+        # caller holds the lock
+        if self.ttl is not None:
+            cur = self._conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += max(cur.rowcount, 0)
+        if self.max_entries is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            extra = count - self.max_entries
+            if extra > 0:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                    (extra,),
+                )
+                self.evictions += extra
+
+    # ---------- introspection ----------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
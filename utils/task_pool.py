@@ -0,0 +1,57 @@
+# utils/task_pool.py
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class BoundedTaskPool:
+    """
+    Run keyed coroutines with at most `max_inflight` executing at once and a
+    per-call timeout. `drain(deadline)` waits until everything finished or the
+    deadline passed, cancels the stragglers and reports what completed.
+
+        pool = BoundedTaskPool(max_inflight=8, call_timeout=10)
+        pool.submit(tid, lambda: fetch(tid))
+        done, timed_out = await pool.drain(deadline)
+    """
+
+    def __init__(self, max_inflight: int = 8, call_timeout: Optional[float] = None):
+        self._sem = asyncio.Semaphore(max(1, max_inflight))
+        self.call_timeout = call_timeout
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.failed: List[Hashable] = []
+
+    def submit(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._tasks:
+            return
+        self._tasks[key] = asyncio.create_task(self._run(key, factory))
+
+    async def _run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._sem:
+            try:
+                return await asyncio.wait_for(factory(), self.call_timeout)
+            except Exception:
+                self.failed.append(key)
+                raise
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self, deadline: Optional[float] = None) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """
+        Wait for submitted work until `deadline` (a time.monotonic() value).
+        Returns ({key: result} for calls that succeeded, [keys cut off by the deadline]).
+        """
+        tasks = list(self._tasks.values())
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        done: Dict[Hashable, Any] = {}
+        cut: List[Hashable] = []
+        for key, task in self._tasks.items():
+            if not task.done():
+                task.cancel()
+                cut.append(key)
+            elif not task.cancelled() and task.exception() is None:
+                done[key] = task.result()
+        return done, cut
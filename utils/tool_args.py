@@ -0,0 +1,108 @@
+# utils/tool_args.py
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# MCP servers disagree on argument names (thread_id vs id vs threadId, query vs q).
+# Callers use the canonical names on the left; the tool's declared input schema
+# decides which alias is actually sent. The resolved binding is memoized per
+# (tool, argument set), so every call goes out right the first time instead of
+# failing its way through guesses over the stdio pipe.
+
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "thread_id": ("thread_id", "id", "threadId"),  # never a message id: those name one message, not the thread
+    "query": ("query", "q", "search", "searchQuery"),
+    "pageToken": ("pageToken", "page_token", "nextPageToken", "cursor"),
+    "url": ("url", "uri", "link"),
+}
+OPTIONAL = {"pageToken"}  # fine to drop when the tool doesn't declare it
+
+_bindings: Dict[Tuple[str, FrozenSet[str]], Dict[str, str]] = {}
+_stats = {"calls": 0, "first_try": 0, "failed_attempts": 0, "round_trips_saved": 0}
+
+
+def _schema_props(tool) -> Optional[Dict[str, Any]]:
+    try:
+        props = tool.args  # works for JSON-schema dicts and pydantic models alike
+    except Exception:
+        return None
+    return props if isinstance(props, dict) and props else None
+
+
+def accepts_arg(tool, canonical: str) -> Optional[bool]:
+    """True/False if the tool's schema says whether it takes `canonical` (or an alias); None if unknown."""
+    props = _schema_props(tool)
+    if props is None:
+        return None
+    return any(a in props for a in ALIASES.get(canonical, (canonical,)))
+
+
+def _bind_from_schema(props: Dict[str, Any], keys: FrozenSet[str]) -> Dict[str, str]:
+    binding: Dict[str, str] = {}
+    for key in keys:
+        for alias in ALIASES.get(key, (key,)):
+            if alias in props:
+                binding[key] = alias
+                break
+        # keys the tool doesn't declare are dropped rather than sent blind
+    return binding
+
+
+def _apply(binding: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {binding[k]: v for k, v in payload.items() if k in binding}
+
+
+def _guesses(payload: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Schema-less fallback: the caller's names first, then one alias swap at a time."""
+    keys = list(payload)
+    out = [{k: k for k in keys}]
+    for k in keys:
+        for alias in ALIASES.get(k, ())[1:]:
+            out.append({**{x: x for x in keys}, k: alias})
+    return out
+
+
+def _saved(binding: Dict[str, str]) -> int:
+    # round trips the old try/except/retry helpers burned before reaching this binding
+    return sum(ALIASES[k].index(a) for k, a in binding.items() if k in ALIASES)
+
+
+async def call_tool(tool, payload: Dict[str, Any]) -> Any:
+    """Invoke an MCP tool with canonical argument names mapped onto its schema."""
+    name = getattr(tool, "name", "") or repr(tool)
+    memo_key = (name, frozenset(payload))
+    _stats["calls"] += 1
+
+    binding = _bindings.get(memo_key)
+    if binding is None:
+        props = _schema_props(tool)
+        if props is not None:
+            binding = _bind_from_schema(props, memo_key[1])
+            if set(binding) >= memo_key[1] - OPTIONAL:
+                _bindings[memo_key] = binding
+            else:
+                binding = None  # schema doesn't cover what we need; fall back to guessing
+    if binding is not None:
+        _stats["first_try"] += 1
+        _stats["round_trips_saved"] += _saved(binding)
+        return await tool.ainvoke(_apply(binding, payload))
+
+    # No schema to go on: try the known spellings once, then remember the winner
+    last_exc: Optional[Exception] = None
+    for i, guess in enumerate(_guesses(payload)):
+        try:
+            res = await tool.ainvoke(_apply(guess, payload))
+        except Exception as e:
+            _stats["failed_attempts"] += 1
+            last_exc = e
+            continue
+        _bindings[memo_key] = guess
+        if i == 0:
+            _stats["first_try"] += 1
+        return res
+    raise last_exc  # type: ignore[misc]
+
+
+def binding_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "bindings": {f"{n}({','.join(sorted(k))})": b for (n, k), b in _bindings.items()},
+    }
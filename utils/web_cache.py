@@ -0,0 +1,264 @@
+# utils/web_cache.py
+import os
+import re
+import json
+import asyncio
+import time
+import zlib
+import sqlite3
+import hashlib
+import functools
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from utils.metrics import counter
+from utils.sqlite_cache import cache_dir
+from utils.tool_args import ALIASES
+
+# Firecrawl scrape/search results, shared by every prep run (and every user:
+# these are public pages). mcp_client wraps the web.scrape and web.search
+# tools with cached_tool() when a tool set is installed. A call is keyed on
+# the tool plus its arguments, with the URL or query normalized, so
+# ?utm_source=... variants of a careers page are one entry. Results are
+# stored by content hash, zlib-compressed: two URLs that serve the same page
+# share one blob. Entries expire per kind (pages live longer than searches,
+# which carry news) and the least recently used go first once the stored
+# bytes pass WEB_CACHE_MAX_MB. Errors and empty results are never cached.
+# Identical calls already in flight share one Firecrawl request.
+
+SCRAPE_TTL = float(os.environ.get("WEB_CACHE_SCRAPE_TTL", 3 * 24 * 3600))
+SEARCH_TTL = float(os.environ.get("WEB_CACHE_SEARCH_TTL", 6 * 3600))
+MAX_BYTES = int(float(os.environ.get("WEB_CACHE_MAX_MB", 200)) * 1024 * 1024)
+COMPRESS_LEVEL = int(os.environ.get("WEB_CACHE_ZLIB_LEVEL", 6))
+
+_TTLS = {"web.scrape": SCRAPE_TTL, "web.search": SEARCH_TTL}
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|_hsenc|_hsmi|ref_src|trk)$", re.I)
+
+_LOOKUPS = counter("prephub_web_cache_total", "Web tool calls by cache result (hit, miss, bypass).")
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, no default port, fragment or tracking params, sorted query, no trailing slash."""
+    url = (url or "").strip()
+    try:
+        p = urlsplit(url)
+        port = p.port
+    except ValueError:
+        return url
+    host = (p.hostname or "").lower()
+    scheme = (p.scheme or "https").lower()
+    netloc = host if port is None or (scheme, port) in (("http", 80), ("https", 443)) else f"{host}:{port}"
+    query = sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k))
+    return urlunsplit((scheme, netloc, p.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def cache_key(tool_name: str, args: Dict[str, Any]) -> str:
+    norm = {}
+    for k, v in args.items():
+        if isinstance(v, str) and k in ALIASES["url"]:
+            v = normalize_url(v)
+        elif isinstance(v, str) and k in ALIASES["query"]:
+            v = normalize_query(v)
+        norm[k] = v
+    blob = json.dumps([tool_name, norm], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class WebCache:
+    """
+    Content-addressed result store: `entries` maps a call key to a blob
+    digest, `blobs` holds each distinct result once, zlib-compressed. Safe to
+    share across threads; every call is a single short transaction.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path or os.path.join(cache_dir(), "web_tools.sqlite")
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.deduped = 0        # stores whose content was already on disk under another key
+        self.bytes_saved = 0    # uncompressed result bytes served without a Firecrawl call
+        self.evictions = 0
+        self.joined = 0         # calls that waited on an identical call already in flight
+        self.by_tool: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " digest TEXT PRIMARY KEY, data BLOB NOT NULL, raw_bytes INTEGER NOT NULL, stored_bytes INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, tool TEXT NOT NULL, digest TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries(digest)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+
+    def _count(self, tool: str, field: str, n: int = 1) -> None:
+        st = self.by_tool.setdefault(tool, {"hits": 0, "misses": 0, "bytes_saved": 0})
+        st[field] += n
+
+    # ---------- reads ----------
+
+    def get(self, key: str, tool: str = "") -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.expires_at, b.data, b.raw_bytes FROM entries e JOIN blobs b ON b.digest = e.digest"
+                " WHERE e.key = ?", (key,)).fetchone()
+            if row is not None and row[0] < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                self._count(tool, "misses")
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.bytes_saved += row[2]
+            self._count(tool, "hits")
+            self._count(tool, "bytes_saved", row[2])
+        return json.loads(zlib.decompress(row[1]))
+
+    # ---------- writes ----------
+
+    def set(self, key: str, value: Any, ttl: float, tool: str = "") -> None:
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                self.deduped += 1
+            else:
+                data = zlib.compress(raw, COMPRESS_LEVEL)
+                self._conn.execute("INSERT INTO blobs (digest, data, raw_bytes, stored_bytes) VALUES (?, ?, ?, ?)",
+                                   (digest, data, len(raw), len(data)))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, tool, digest, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, tool, digest, now + ttl, now),
+            )
+            self.stores += 1
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM blobs")
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        # caller holds the lock
+        cur = self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        self.evictions += max(cur.rowcount, 0)
+        self._conn.execute("DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)")
+        while self._stored_bytes() > self.max_bytes:
+            cur = self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT 16)")
+            if cur.rowcount <= 0:
+                break
+            self.evictions += cur.rowcount
+            self._conn.execute("DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)")
+
+    # ---------- introspection ----------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(stored_bytes), 0) FROM blobs").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "blobs": blobs,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "stored_bytes": stored,
+            "raw_bytes": raw,
+            "compression_ratio": round(raw / stored, 2) if stored else None,
+            "max_bytes": self.max_bytes,
+            "stores": self.stores,
+            "deduped": self.deduped,
+            "evictions": self.evictions,
+            "joined": self.joined,
+            "by_tool": {k: dict(v) for k, v in self.by_tool.items()},
+        }
+
+
+_web_cache: Optional[WebCache] = None
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def get_web_cache() -> Optional[WebCache]:
+    global _web_cache
+    if os.environ.get("WEB_CACHE_DISABLE") == "1":
+        return None
+    if _web_cache is None:
+        _web_cache = WebCache()
+    return _web_cache
+
+
+def _cacheable(value: Any) -> bool:
+    content = value[0] if isinstance(value, tuple) and len(value) == 2 else value  # content_and_artifact
+    return bool(content)
+
+
+def cached_tool(tool: Any, capability: str) -> Any:
+    """
+    A copy of a LangChain tool whose calls go through the web cache. The cache
+    is looked up per call, so WEB_CACHE_DISABLE=1 takes effect without a
+    tool reload. Tools without a coroutine are returned unchanged.
+    """
+    call = getattr(tool, "coroutine", None)
+    if call is None or getattr(call, "_web_cached", False):
+        return tool
+    ttl = _TTLS.get(capability, SEARCH_TTL)
+    name = getattr(tool, "name", "") or capability
+    try:
+        declared = set(tool.args)  # JSON-schema properties; anything else (injected runtime) isn't part of the key
+    except Exception:
+        declared = set()
+
+    @functools.wraps(call)
+    async def cached_call(*args: Any, **kwargs: Any) -> Any:
+        cache = get_web_cache()
+        if cache is None or args:
+            _LOOKUPS.inc(tool=name, result="bypass")
+            return await call(*args, **kwargs)
+        key = cache_key(name, {k: v for k, v in kwargs.items() if (k in declared if declared else k != "runtime")})
+        task = _inflight.get(key)
+        if task is not None:
+            cache.joined += 1
+            _LOOKUPS.inc(tool=name, result="joined")
+            return await asyncio.shield(task)
+        hit = cache.get(key, name)
+        if hit is not None:
+            _LOOKUPS.inc(tool=name, result="hit")
+            return tuple(hit) if getattr(tool, "response_format", "") == "content_and_artifact" else hit
+        _LOOKUPS.inc(tool=name, result="miss")
+
+        async def fetch() -> Any:
+            value = await call(**kwargs)
+            if _cacheable(value):
+                try:
+                    cache.set(key, value, ttl, name)
+                except (TypeError, ValueError) as e:  # not JSON-serializable: serve it, don't store it
+                    print("[web_cache] not cached:", repr(e))
+            return value
+
+        task = _inflight[key] = asyncio.ensure_future(fetch())
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    cached_call._web_cached = True  # type: ignore[attr-defined]
+    return tool.model_copy(update={"coroutine": cached_call})